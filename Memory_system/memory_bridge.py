@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import os
 import re
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any, Mapping, Sequence
 from dataclasses import dataclass
 
@@ -110,21 +113,19 @@ class MemoryBridge:
     @staticmethod
     def from_finish_form(finish_form_path: str | Path) -> MemoryBridge:
         bridge = MemoryBridge()
-        path = Path(finish_form_path)
-        if not path.exists():
+        content = _read_finish_form(finish_form_path)
+        if content is None:
             return bridge
         
-        content = path.read_text(encoding="utf-8")
         bridge.add_section("Collaboration Form", content, source="finish_form")
         return bridge
     
     @staticmethod
     def load_stage_output(finish_form_path: str | Path, marker: str) -> str:
-        path = Path(finish_form_path)
-        if not path.exists():
+        content = _read_finish_form(finish_form_path)
+        if content is None:
             return ""
         
-        content = path.read_text(encoding="utf-8")
         start_marker = f"<!-- {marker}_START -->"
         end_marker = f"<!-- {marker}_END -->"
         
@@ -141,12 +142,43 @@ class MemoryBridge:
 ANCHOR_PATTERN = re.compile(r"<!--\s*([A-Z0-9_]+)_START\s*-->")
 
 
-def _load_anchor_sections(finish_form_path: str | Path) -> dict[str, str]:
-    path = Path(finish_form_path)
-    if not path.exists():
+def _stat_key(finish_form_path: str | Path) -> tuple[str, int, int] | None:
+    try:
+        stat = os.stat(finish_form_path)
+    except FileNotFoundError:
+        return None
+    return str(finish_form_path), stat.st_mtime_ns, stat.st_size
+
+
+def _read_finish_form(finish_form_path: str | Path) -> str | None:
+    key = _stat_key(finish_form_path)
+    if key is None:
+        return None
+    return _read_cached(*key)
+
+
+@lru_cache(maxsize=8)
+def _read_cached(path: str, mtime_ns: int, size: int) -> str | None:
+    """按 (路径, 修改时间, 大小) 缓存 finish_form 文本；各阶段写入后自动失效。"""
+
+    try:
+        return Path(path).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+
+def _load_anchor_sections(finish_form_path: str | Path) -> Mapping[str, str]:
+    key = _stat_key(finish_form_path)
+    if key is None:
         return {}
+    return _parse_anchor_sections_cached(*key)
 
-    content = path.read_text(encoding="utf-8")
+
+@lru_cache(maxsize=8)
+def _parse_anchor_sections_cached(path: str, mtime_ns: int, size: int) -> Mapping[str, str]:
+    content = _read_cached(path, mtime_ns, size)
+    if content is None:
+        return {}
     sections: dict[str, str] = {}
 
     for match in ANCHOR_PATTERN.finditer(content):
@@ -157,7 +189,8 @@ def _load_anchor_sections(finish_form_path: str | Path) -> dict[str, str]:
             continue
         sections[marker] = content[match.end():end_idx].strip()
 
-    return sections
+    # 缓存结果在多次调用间共享，只读视图防止被调用方修改
+    return MappingProxyType(sections)
 
 
 EXTERNAL_SECTION_DESCRIPTORS = [
@@ -195,6 +228,17 @@ WATCHER_SECTION_DESCRIPTORS = [
     ("WATCHER_REALTIME", "Watcher Realtime Guidance", "watcher_agent"),
 ]
 
+# 各阶段可见的锚点按阶段递增累积，在导入时拼好，构建上下文时直接复用
+_STAGE1_DESCRIPTORS = tuple(EXTERNAL_SECTION_DESCRIPTORS + STAGE1_SECTION_DESCRIPTORS)
+_STAGE2A_DESCRIPTORS = _STAGE1_DESCRIPTORS + tuple(STAGE2A_SECTION_DESCRIPTORS)
+_STAGE2B_DESCRIPTORS = _STAGE2A_DESCRIPTORS + tuple(STAGE2B_SECTION_DESCRIPTORS)
+_STAGE3_DESCRIPTORS = _STAGE2B_DESCRIPTORS + tuple(STAGE3_SECTION_DESCRIPTORS)
+_STAGE4_DESCRIPTORS = (
+    _STAGE3_DESCRIPTORS
+    + tuple(STAGE4_SECTION_DESCRIPTORS)
+    + tuple(WATCHER_SECTION_DESCRIPTORS)
+)
+
 
 def _add_sections_from_markers(
     bridge: MemoryBridge,
@@ -218,8 +262,7 @@ def create_stage1_context(
         bridge.add_user_context(user_context)
 
     anchor_sections = _load_anchor_sections(finish_form_path)
-    descriptors = EXTERNAL_SECTION_DESCRIPTORS + STAGE1_SECTION_DESCRIPTORS
-    _add_sections_from_markers(bridge, anchor_sections, descriptors)
+    _add_sections_from_markers(bridge, anchor_sections, _STAGE1_DESCRIPTORS)
 
     return bridge.build_context()
 
@@ -235,12 +278,7 @@ def create_stage2a_context(
         bridge.add_context_snapshot(context_snapshot)
 
     anchor_sections = _load_anchor_sections(finish_form_path)
-    descriptors = (
-        EXTERNAL_SECTION_DESCRIPTORS
-        + STAGE1_SECTION_DESCRIPTORS
-        + STAGE2A_SECTION_DESCRIPTORS
-    )
-    _add_sections_from_markers(bridge, anchor_sections, descriptors)
+    _add_sections_from_markers(bridge, anchor_sections, _STAGE2A_DESCRIPTORS)
 
     return bridge.build_context()
 
@@ -256,13 +294,7 @@ def create_stage2b_context(
         bridge.add_context_snapshot(context_snapshot)
 
     anchor_sections = _load_anchor_sections(finish_form_path)
-    descriptors = (
-        EXTERNAL_SECTION_DESCRIPTORS
-        + STAGE1_SECTION_DESCRIPTORS
-        + STAGE2A_SECTION_DESCRIPTORS
-        + STAGE2B_SECTION_DESCRIPTORS
-    )
-    _add_sections_from_markers(bridge, anchor_sections, descriptors)
+    _add_sections_from_markers(bridge, anchor_sections, _STAGE2B_DESCRIPTORS)
 
     return bridge.build_context()
 
@@ -281,14 +313,7 @@ def create_stage3_context(
         bridge.add_attachments(attachments)
 
     anchor_sections = _load_anchor_sections(finish_form_path)
-    descriptors = (
-        EXTERNAL_SECTION_DESCRIPTORS
-        + STAGE1_SECTION_DESCRIPTORS
-        + STAGE2A_SECTION_DESCRIPTORS
-        + STAGE2B_SECTION_DESCRIPTORS
-        + STAGE3_SECTION_DESCRIPTORS
-    )
-    _add_sections_from_markers(bridge, anchor_sections, descriptors)
+    _add_sections_from_markers(bridge, anchor_sections, _STAGE3_DESCRIPTORS)
 
     return bridge.build_context()
 
@@ -307,16 +332,7 @@ def create_stage4_context(
         bridge.add_context_snapshot(context_snapshot)
 
     anchor_sections = _load_anchor_sections(finish_form_path)
-    descriptors = (
-        EXTERNAL_SECTION_DESCRIPTORS
-        + STAGE1_SECTION_DESCRIPTORS
-        + STAGE2A_SECTION_DESCRIPTORS
-        + STAGE2B_SECTION_DESCRIPTORS
-        + STAGE3_SECTION_DESCRIPTORS
-        + STAGE4_SECTION_DESCRIPTORS
-        + WATCHER_SECTION_DESCRIPTORS
-    )
-    _add_sections_from_markers(bridge, anchor_sections, descriptors)
+    _add_sections_from_markers(bridge, anchor_sections, _STAGE4_DESCRIPTORS)
 
     return bridge.build_context()
 
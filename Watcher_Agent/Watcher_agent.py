@@ -5,7 +5,7 @@ import json
 import re
 import sys
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, Mapping, Sequence
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
@@ -84,6 +84,63 @@ class WatcherAgent(BaseAgent):
 
         return False
 
+    async def audit_batch_text(self, audits: Sequence[Mapping[str, Any]]) -> list[str]:
+        """在一次模型调用中审计多份阶段结果，按输入顺序返回各自的审计建议。"""
+        if not audits:
+            return []
+
+        messages = []
+        if self._system_prompt:
+            messages.append({"role": "system", "content": self._system_prompt})
+        messages.append({"role": "user", "content": self._build_batch_audit_context(audits)})
+
+        response = await self._model(messages=messages)
+        response_text = self._extract_text(response)
+        return self._split_batch_audit(response_text, len(audits))
+
+    def _build_batch_audit_context(self, audits: Sequence[Mapping[str, Any]]) -> str:
+        sections = ["# Batch Audit Request"]
+        for audit_id, audit in enumerate(audits, 1):
+            sections.append(f"\n## Audit {audit_id}")
+            for key, value in audit.items():
+                if value is None or value == "":
+                    continue
+                if not isinstance(value, str):
+                    try:
+                        value = json.dumps(value, ensure_ascii=False)
+                    except Exception:
+                        value = str(value)
+                sections.append(f"- {key}: {value}")
+
+        sections.append("""
+## Your Task
+
+Audit each result above independently against the audit standards.
+
+## Output Format
+
+Output ONLY a JSON object mapping each audit number to its audit advice:
+
+```json
+{"1": "...", "2": "..."}
+```
+""")
+        return "\n".join(sections)
+
+    @staticmethod
+    def _split_batch_audit(response_text: str, count: int) -> list[str]:
+        # 贪婪匹配到最后一个右花括号，避免审计意见中的 "}" 截断 JSON
+        match = re.search(r"```(?:json)?\s*(\{.*\})\s*```", response_text, re.DOTALL)
+        raw = match.group(1) if match else response_text.strip()
+        try:
+            parsed = json.loads(raw)
+        except ValueError:
+            parsed = None
+        if not isinstance(parsed, dict):
+            # 无法拆分时，每份审计都返回完整回复
+            return [response_text] * count
+        return [str(parsed.get(str(audit_id), "")) for audit_id in range(1, count + 1)]
+
     def _build_revision_context(
         self,
         *,
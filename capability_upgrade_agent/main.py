@@ -22,7 +22,7 @@ except ImportError:
 
     from capability_upgrade_agent import CapabilityUpgradeAgent, CapabilityUpgradeConfig
 
-EXIT_COMMANDS = {"exit", "quit", "q"}
+EXIT_COMMANDS = frozenset({"exit", "quit", "q"})
 REFRESH_COMMANDS = {"refresh", "reload"}
 APPLY_COMMANDS = {"apply", "write"}
 
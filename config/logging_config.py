@@ -14,6 +14,18 @@ from typing import Optional
 import uuid
 from contextvars import ContextVar
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+if orjson is not None:
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+else:  # pragma: no cover - stdlib fallback
+    def _dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
 # 全局 trace_id 上下文变量
 trace_id_var: ContextVar[str] = ContextVar('trace_id', default='')
 
@@ -55,7 +67,7 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, 'extra_fields'):
             log_obj.update(record.extra_fields)
 
-        return json.dumps(log_obj, ensure_ascii=False)
+        return _dumps(log_obj)
 
 class StructuredTextFormatter(logging.Formatter):
     """结构化的文本格式日志（人类可读）"""
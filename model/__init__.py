@@ -4,12 +4,24 @@
 from ._model_base import ChatModelBase
 from ._model_response import ChatResponse, ResponseBlock
 from ._deepseek_model import DeepSeekChatModel
+from ._http_client import (
+    DEFAULT_HTTP_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    SharedAsyncClient,
+    create_shared_http_client,
+    make_http_timeout,
+)
 from ._openai_model import OpenAIChatModel
 
 __all__ = [
     "ChatModelBase",
+    "DEFAULT_HTTP_TIMEOUT",
+    "DEFAULT_READ_TIMEOUT",
     "ChatResponse",
     "ResponseBlock",
     "DeepSeekChatModel",
     "OpenAIChatModel",
+    "SharedAsyncClient",
+    "create_shared_http_client",
+    "make_http_timeout",
 ]
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Shared HTTP client for agents that talk to the same LLM endpoint."""
+
+from __future__ import annotations
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # pragma: no cover - optional speedup
+    h2 = None
+
+# Non-streaming completions from reasoning models can take minutes before the first
+# byte, so reads keep the OpenAI SDK's 600s default.
+DEFAULT_READ_TIMEOUT = 600.0
+
+
+def make_http_timeout(read: float = DEFAULT_READ_TIMEOUT) -> httpx.Timeout:
+    """Fail fast on connect/pool so a slow read never stalls fresh connection attempts."""
+
+    return httpx.Timeout(connect=5.0, read=read, write=30.0, pool=5.0)
+
+
+DEFAULT_HTTP_TIMEOUT = make_http_timeout()
+
+
+class SharedAsyncClient(httpx.AsyncClient):
+    """``httpx.AsyncClient`` that survives ``dataclasses.asdict`` / ``deepcopy``.
+
+    Agent configs are copied with ``asdict`` before use; a shared client must be
+    passed through by reference instead of being cloned.
+    """
+
+    def __deepcopy__(self, memo: dict) -> SharedAsyncClient:
+        return self
+
+
+def create_shared_http_client(
+    *,
+    max_connections: int = 64,
+    max_keepalive_connections: int = 32,
+    read_timeout: float = DEFAULT_READ_TIMEOUT,
+) -> SharedAsyncClient:
+    """创建供多个 ``OpenAIChatModel`` 复用的连接池（安装 h2 时启用 HTTP/2）。
+
+    通过 ``client_args={"http_client": client}`` 注入；OpenAI 客户端会按请求
+    覆盖超时，需要拆分超时时请同时传入 ``client_args["timeout"]``。
+    """
+
+    return SharedAsyncClient(
+        http2=h2 is not None,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        ),
+        timeout=make_http_timeout(read_timeout),
+    )
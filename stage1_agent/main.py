@@ -35,7 +35,7 @@ except ImportError:
 
 from config import ModelConfig
 
-EXIT_COMMANDS = {"exit", "quit", "q"}
+EXIT_COMMANDS = frozenset({"exit", "quit", "q"})
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 load_dotenv(PROJECT_ROOT / ".env")
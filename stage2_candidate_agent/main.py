@@ -34,7 +34,7 @@ except ImportError:  # pragma: no cover
 from config import ModelConfig
 
 
-EXIT_COMMANDS = {"exit", "quit", "q"}
+EXIT_COMMANDS = frozenset({"exit", "quit", "q"})
 MULTILINE_SENTINEL = "END"
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -28,7 +28,7 @@ except ImportError:  # pragma: no cover
         Stage2CapabilityUpgradeConfig,
     )
 
-EXIT_COMMANDS = {"exit", "quit", "q"}
+EXIT_COMMANDS = frozenset({"exit", "quit", "q"})
 REFRESH_COMMANDS = {"refresh", "reload"}
 APPLY_COMMANDS = {"apply", "write"}
 
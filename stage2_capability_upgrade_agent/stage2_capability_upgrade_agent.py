@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import hashlib
 import re
 import sys
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
@@ -20,6 +21,16 @@ from capability_upgrade_agent.capability_upgrade_agent import (
 PROMPT_PATH = Path(__file__).with_name("thinking.md")
 STRATEGY_LIBRARY_DIR = PROJECT_ROOT / "strategy_library"
 STRATEGY_LIBRARY_FILE = STRATEGY_LIBRARY_DIR / "strategy.md"
+NOOP_CACHE_SIZE = 256
+
+# 融合信号：显式关键词或 "I1-I2" 形式的策略编号组合
+_FUSION_KEYWORDS = ("融合", "合并", "fusion")
+_FUSION_ID_PAIR = re.compile(r"[A-Z]\d+\s*[-·+]\s*[A-Z]\d+")
+
+
+def _needs_fusion(report: str) -> bool:
+    lowered = report.lower()
+    return any(token in lowered for token in _FUSION_KEYWORDS) or bool(_FUSION_ID_PAIR.search(report))
 
 
 @dataclass(slots=True)
@@ -56,12 +67,17 @@ class Stage2CapabilityUpgradeAgent(CapabilityUpgradeAgent):
         self._min_reference_ids = int(config_data.pop("min_reference_ids", 2) or 2)
         self._required_justifications: Tuple[str, ...] = ("coverage_gap", "reuse_failure", "new_value")
         self._session_new_counts: Dict[str, int] = defaultdict(int)
+        # 输入指纹 -> 无补丁时的输出文本；命中时直接跳过模型调用
+        self._noop_cache: OrderedDict[str, str] = OrderedDict()
 
         if not config_data.get("library_file"):
             config_data["library_file"] = str(STRATEGY_LIBRARY_FILE)
 
         stage2_config = Stage2CapabilityUpgradeConfig(**config_data)
         super().__init__(config=stage2_config)
+        # 补丁须先通过决策头校验再落盘，基类不得在 evaluate() 中提前写入
+        self._apply_after_review = self._auto_apply_patch
+        self._auto_apply_patch = False
 
     def _compose_default_system_prompt(self) -> str | None:
         template = self._load_prompt_template()
@@ -80,7 +96,29 @@ class Stage2CapabilityUpgradeAgent(CapabilityUpgradeAgent):
         content = PROMPT_PATH.read_text(encoding="utf-8").strip()
         return content or None
 
+    def _noop_cache_key(self, kwargs: Dict[str, Any]) -> str:
+        # 系统提示词中包含策略库快照，库变化后指纹随之失效
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update((self._system_prompt or "").encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(repr(sorted(kwargs.items())).encode("utf-8"))
+        return digest.hexdigest()
+
     async def evaluate_text(self, **kwargs: Any) -> str:
+        cache_key = self._noop_cache_key(kwargs)
+        cached = self._noop_cache.get(cache_key)
+        if cached is not None:
+            self._noop_cache.move_to_end(cache_key)
+            self._last_patch_markdown = None
+            self._last_applied_path = None
+            return cached
+
+        skip_reason = self._prescreen_skip_reason(kwargs)
+        if skip_reason:
+            self._last_patch_markdown = None
+            self._last_applied_path = None
+            return f"DECISION: SKIP\nREASON: {skip_reason}\n\nAUTO_APPLY_STATUS: skipped ({skip_reason})"
+
         result_text = await super().evaluate_text(**kwargs)
         patch_markdown = self.last_patch_markdown
         decision_info = self._parse_decision_metadata(result_text)
@@ -90,6 +128,8 @@ class Stage2CapabilityUpgradeAgent(CapabilityUpgradeAgent):
 
         if decision_info.get("decision") == "APPLY" and patch_markdown:
             should_apply, apply_reason = self._should_apply_patch(decision_info, patch_markdown)
+            if should_apply and not self._apply_after_review:
+                should_apply, apply_reason = False, "auto apply disabled"
             if should_apply:
                 self.apply_patch(patch_markdown)
                 new_category = decision_info.get("new_category")
@@ -116,8 +156,30 @@ class Stage2CapabilityUpgradeAgent(CapabilityUpgradeAgent):
         if "AUTO_APPLY_STATUS:" not in result_text:
             result_text = result_text.rstrip() + "\n\n" + status_line
 
+        # 仅缓存由模型输出本身决定的"无补丁"结果；因配额等会话状态被拒绝的补丁不缓存
+        if decision_info.get("decision") != "APPLY" or not patch_markdown:
+            self._noop_cache[cache_key] = result_text
+            if len(self._noop_cache) > NOOP_CACHE_SIZE:
+                self._noop_cache.popitem(last=False)
+
         return result_text
 
+    @staticmethod
+    def _prescreen_skip_reason(kwargs: Dict[str, Any]) -> str | None:
+        """模型将收到的 ``context`` 中没有融合信号时，直接跳过模型调用。
+
+        本代理只负责收录阶段二-B 产生的融合/合并策略；上下文里既无融合关键词、
+        也无 "I1-I2" 形式的策略编号组合时，模型只会给出 SKIP。
+        """
+
+        context = kwargs.get("context")
+        if not isinstance(context, str):
+            # 缺少 context 时交由 evaluate() 报告参数错误
+            return None
+        if _needs_fusion(context):
+            return None
+        return "no fusion signal in context"
+
     def _parse_decision_metadata(self, text: str) -> Dict[str, Any]:
         metadata: Dict[str, Any] = {}
         if not text:
@@ -34,7 +34,7 @@ from model._model_response import ChatResponse
 
 load_dotenv(PROJECT_ROOT / ".env")
 
-EXIT_COMMANDS = {"exit", "quit", "q"}
+EXIT_COMMANDS = frozenset({"exit", "quit", "q"})
 MULTILINE_SENTINEL = "END"
 
 DEFAULT_TOOL_CATALOG = load_tool_catalog()
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import asyncio
+import functools
 import inspect
 import json
 import re
@@ -15,7 +17,7 @@ if str(PROJECT_ROOT) not in sys.path:
 
 from agents import BaseAgent
 from config import ModelConfig
-from model import ChatResponse, OpenAIChatModel
+from model import ChatResponse, OpenAIChatModel, ResponseBlock
 from workflow.finish_form_utils import (
     read_live_plan,
     update_live_plan,
@@ -26,9 +28,41 @@ from workflow.document_orchestrator import DocumentOrchestrator
 from stage4_agent.tools_bridge import ToolsBridge, ToolResult
 from _logging import logger as LOGGER
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 PROMPT_PATH = Path(__file__).with_name("executor.md")
 
 
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dumps(obj: Any, indent: bool = False) -> str:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode("utf-8")
+else:  # pragma: no cover - stdlib fallback
+    _loads = json.loads
+
+    def _dumps(obj: Any, indent: bool = False) -> str:
+        return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+# JSON 值只可能以这些字符开头；其余参数直接按原始字符串处理，避免抛出/捕获解析异常
+_JSON_START_CHARS = frozenset('"{[-0123456789tfn')
+
+
+@functools.lru_cache(maxsize=1)
+def _load_executor_prompt(mtime_ns: int) -> str | None:
+    """Read executor.md once per file revision; ``mtime_ns`` keys the cache."""
+    content = PROMPT_PATH.read_text(encoding="utf-8")
+    end_marker = "<!-- REFLECTION_TEMPLATE_START -->"
+    idx = content.find(end_marker)
+    if idx != -1:
+        content = content[:idx]
+    return content.strip() or None
+
+
 class Stage4ExecutorAgent(BaseAgent):
     agent_name: str = "Stage4ExecutorAgent"
     agent_stage: str = "stage4"
@@ -39,19 +73,41 @@ class Stage4ExecutorAgent(BaseAgent):
         re.IGNORECASE,
     )
 
-    def __init__(self, max_iterations: int = 10, **kwargs: Any) -> None:
+    _SECTION_HEADER_RE = re.compile(r"^[^\S\n]*## ", re.MULTILINE)
+    _FLUSH_LEFT_LINE_RE = re.compile(r"^\S", re.MULTILINE)
+    _WHITESPACE_ONLY_LINE_RE = re.compile(r"^[ \t]+$", re.MULTILINE)
+
+    _TOOL_TOP_LEVEL_KEYS: frozenset[str] = frozenset({
+        "tool", "query", "url", "format", "expression",
+        "max_results", "provider", "fallback_queries", "min_results",
+    })
+
+    # 无副作用、可在同一轮内并发执行的工具
+    CONCURRENT_SAFE_TOOLS: frozenset[str] = frozenset({"web_search", "web_scrape", "calculate"})
+
+    # 粗略按 4 字符 ≈ 1 token 估算；超出预算时只保留最近若干条消息
+    HISTORY_TOKEN_BUDGET = 8000
+    HISTORY_KEEP_RECENT = 6
+    HISTORY_TRUNCATED_NOTE = "[TRUNCATED earlier tool results; the live plan reflects progress so far]"
+
+    def __init__(
+        self,
+        max_iterations: int = 10,
+        history_token_budget: int | None = None,
+        **kwargs: Any,
+    ) -> None:
         super().__init__(**kwargs)
         self._max_iterations = max_iterations
+        self._history_token_budget = (
+            history_token_budget if history_token_budget is not None else self.HISTORY_TOKEN_BUDGET
+        )
 
     def _load_default_prompt(self) -> str | None:
-        if not PROMPT_PATH.exists():
+        try:
+            mtime_ns = PROMPT_PATH.stat().st_mtime_ns
+        except FileNotFoundError:
             return None
-        content = PROMPT_PATH.read_text(encoding="utf-8")
-        end_marker = "<!-- REFLECTION_TEMPLATE_START -->"
-        idx = content.find(end_marker)
-        if idx != -1:
-            content = content[:idx]
-        return content.strip() or None
+        return _load_executor_prompt(mtime_ns)
 
 
     async def analyze(
@@ -102,28 +158,27 @@ class Stage4ExecutorAgent(BaseAgent):
             else:
                 final_response_text = self._extract_text(response)
 
-        class SyntheticResponse:
-            def __init__(self, text: str):
-                self.content = [type("TextBlock", (), {"type": "text", "text": text})()]
-                self.metadata = None
-                self.raw = None
-
-        return SyntheticResponse(final_response_text)
+        return ChatResponse(content=(ResponseBlock(type="text", text=final_response_text),))
 
-    @staticmethod
-    def _extract_section(context: str, header: str) -> str:
-        lines = context.split("\n")
-        capture = False
-        section_lines: list[str] = []
-        for line in lines:
-            if line.strip().startswith(f"## {header}"):
-                capture = True
-                continue
-            if capture:
-                if line.strip().startswith("## "):
-                    break
-                section_lines.append(line)
-        return "\n".join(section_lines).strip()
+    @classmethod
+    def _extract_section(cls, context: str, header: str) -> str:
+        needle = f"## {header}"
+        pos = context.find(needle)
+        while pos != -1:
+            line_start = context.rfind("\n", 0, pos) + 1
+            if not context[line_start:pos].strip():
+                break
+            pos = context.find(needle, pos + 1)
+        if pos == -1:
+            return ""
+
+        start = context.find("\n", pos)
+        if start == -1:
+            return ""
+        start += 1
+        end_match = cls._SECTION_HEADER_RE.search(context, start)
+        end = end_match.start() if end_match else len(context)
+        return context[start:end].strip()
 
     def _init_live_plan(
         self,
@@ -177,6 +232,7 @@ class Stage4ExecutorAgent(BaseAgent):
 
             messages.append({"role": "assistant", "content": response_text})
             last_response_text = response_text
+            self._trim_history(messages)
 
             tool_calls = self._parse_tool_calls(response_text)
             if not tool_calls:
@@ -185,12 +241,16 @@ class Stage4ExecutorAgent(BaseAgent):
 
             LOGGER.info("[Stage4] Parsed %d tool call(s)", len(tool_calls))
 
-            for call in tool_calls:
+            # 每个调用的参数只序列化一次，日志与工具记录共用
+            args_json = [_dumps(call.get("args", {})) for call in tool_calls]
+            for call, call_args_json in zip(tool_calls, args_json):
+                LOGGER.info("[TOOL_CALL] tool=%s | args=%s", call.get("tool", ""), call_args_json)
+
+            results = await self._execute_tool_calls(tools_bridge, tool_calls)
+
+            for call, call_args_json, result in zip(tool_calls, args_json, results):
                 tool_name = call.get("tool", "")
                 tool_args = call.get("args", {})
-                LOGGER.info("[TOOL_CALL] tool=%s | args=%s", tool_name, json.dumps(tool_args, ensure_ascii=False))
-
-                result: ToolResult = tools_bridge.call_tool(tool_name, **tool_args)
 
                 LOGGER.info(
                     "[TOOL_RESULT] tool=%s | success=%s | error=%s | output=%s",
@@ -219,6 +279,7 @@ class Stage4ExecutorAgent(BaseAgent):
                         tool_args=tool_args,
                         tool_output=result.output,
                         tool_error=result.error,
+                        tool_args_json=call_args_json,
                     )
 
                 if watcher_agent:
@@ -240,6 +301,13 @@ class Stage4ExecutorAgent(BaseAgent):
         LOGGER.info("[Stage4] Loop ended after %d iteration(s)", iteration)
 
         if self._parse_tool_calls(last_response_text):
+            # 模型在最后一次工具调用之后已给出 Final Answer 时，直接采用，省去一次额外的模型往返
+            tail = last_response_text.rsplit("[/TOOL_CALL]", 1)[-1]
+            match = self.FINAL_ANSWER_LABEL_RE.search(tail)
+            if match:
+                LOGGER.info("[Stage4] Final Answer already present, skipping extra round-trip")
+                return tail[match.start():].strip()
+
             messages.append({
                 "role": "user",
                 "content": "[FINAL_ANSWER_REQUIRED] Output your Final Answer now. No more tool calls.",
@@ -255,6 +323,62 @@ class Stage4ExecutorAgent(BaseAgent):
 
         return last_response_text
 
+    async def _execute_tool_calls(
+        self,
+        tools_bridge: ToolsBridge,
+        tool_calls: list[dict[str, Any]],
+    ) -> list[ToolResult]:
+        """Run one turn's tool calls, fanning out side-effect-free tools concurrently.
+
+        Results are returned in the original call order. Tools outside
+        ``CONCURRENT_SAFE_TOOLS`` (e.g. ``code_interpreter``, which keeps
+        interpreter state between calls) still run one at a time. Every call
+        runs in a worker thread, because ``call_tool`` blocks until the tool
+        finishes and the event loop must stay free for concurrent stages.
+        """
+        results: list[ToolResult | None] = [None] * len(tool_calls)
+        concurrent_idx: list[int] = []
+        for idx, call in enumerate(tool_calls):
+            if call.get("tool", "") in self.CONCURRENT_SAFE_TOOLS:
+                concurrent_idx.append(idx)
+
+        if len(concurrent_idx) > 1:
+            gathered = await asyncio.gather(*(
+                asyncio.to_thread(
+                    tools_bridge.call_tool,
+                    tool_calls[idx].get("tool", ""),
+                    **tool_calls[idx].get("args", {}),
+                )
+                for idx in concurrent_idx
+            ))
+            for idx, result in zip(concurrent_idx, gathered):
+                results[idx] = result
+
+        for idx, call in enumerate(tool_calls):
+            if results[idx] is None:
+                results[idx] = await asyncio.to_thread(
+                    tools_bridge.call_tool, call.get("tool", ""), **call.get("args", {})
+                )
+        return results  # type: ignore[return-value]
+
+    def _trim_history(self, messages: list[dict[str, str]]) -> None:
+        """Drop older turns in place once the history exceeds the token budget.
+
+        The live plan is re-read from the finish form every iteration, so it
+        carries the persistent state and older tool results can be discarded.
+        """
+        estimated_tokens = sum(len(m["content"]) for m in messages) // 4
+        if estimated_tokens <= self._history_token_budget:
+            return
+
+        head = 1 if messages and messages[0]["role"] == "system" else 0
+        tail = len(messages) - self.HISTORY_KEEP_RECENT
+        if tail - head <= 1:
+            return
+
+        messages[head:tail] = [{"role": "system", "content": self.HISTORY_TRUNCATED_NOTE}]
+        LOGGER.info("[Stage4] Trimmed message history (~%d tokens before trim)", estimated_tokens)
+
     def _build_iteration_prompt(self, live_plan: str, iteration: int) -> str:
         return f"""# Current Live Plan (Iteration {iteration})
 
@@ -270,7 +394,6 @@ Execute the next step by outputting a [TOOL_CALL] block, or output Final Answer
     def _parse_tool_calls(text: str) -> list[dict[str, Any]]:
         calls: list[dict[str, Any]] = []
         segments = text.split("[TOOL_CALL]")
-        TOP_LEVEL_KEYS = {"tool", "query", "url", "format", "expression", "max_results", "provider", "fallback_queries", "min_results"}
 
         for segment in segments[1:]:
             if "[/TOOL_CALL]" not in segment:
@@ -298,14 +421,8 @@ Execute the next step by outputting a [TOOL_CALL] block, or output Final Answer
                 elif key == "code":
                     code_lines: list[str] = []
                     if val:
-                        try:
-                            parsed_code = json.loads(val)
-                            if isinstance(parsed_code, str):
-                                code_lines.append(parsed_code)
-                            else:
-                                code_lines.append(val)
-                        except Exception:
-                            code_lines.append(val)
+                        parsed_code = Stage4ExecutorAgent._coerce_arg_value(val)
+                        code_lines.append(parsed_code if isinstance(parsed_code, str) else val)
                     i += 1
                     while i < len(lines):
                         next_line = lines[i]
@@ -316,25 +433,42 @@ Execute the next step by outputting a [TOOL_CALL] block, or output Final Answer
                             continue
                         if ":" in next_stripped:
                             potential_key = next_stripped.split(":", 1)[0].strip()
-                            if potential_key in TOP_LEVEL_KEYS:
+                            if potential_key in Stage4ExecutorAgent._TOOL_TOP_LEVEL_KEYS:
                                 break
                             if not next_line.startswith((' ', '\t')) and potential_key.isidentifier():
                                 break
                         code_lines.append(next_line.rstrip())
                         i += 1
-                    raw_code = "\n".join(code_lines)
-                    args["code"] = textwrap.dedent(raw_code).strip()
+                    args["code"] = Stage4ExecutorAgent._dedent_code("\n".join(code_lines))
                 else:
-                    try:
-                        args[key] = json.loads(val)
-                    except Exception:
-                        args[key] = val
+                    args[key] = Stage4ExecutorAgent._coerce_arg_value(val)
                     i += 1
 
             if tool_name:
                 calls.append({"tool": tool_name, "args": args})
         return calls
 
+    @classmethod
+    def _dedent_code(cls, raw_code: str) -> str:
+        """``textwrap.dedent(raw_code).strip()`` with a no-op fast path.
+
+        When some line is already flush-left and there are no whitespace-only
+        lines to normalise, dedent would return the input unchanged.
+        """
+        if cls._FLUSH_LEFT_LINE_RE.search(raw_code) and not cls._WHITESPACE_ONLY_LINE_RE.search(raw_code):
+            return raw_code.strip()
+        return textwrap.dedent(raw_code).strip()
+
+    @staticmethod
+    def _coerce_arg_value(val: str) -> Any:
+        """Decode a JSON-looking argument value, otherwise keep the raw string."""
+        if not val or val[0] not in _JSON_START_CHARS:
+            return val
+        try:
+            return _loads(val)
+        except ValueError:
+            return val
+
     @staticmethod
     def _format_tool_result(call: dict[str, Any], result: ToolResult) -> str:
         parts = [
@@ -355,12 +489,13 @@ Execute the next step by outputting a [TOOL_CALL] block, or output Final Answer
         tool_args: dict[str, Any],
         tool_output: str | None,
         tool_error: str | None,
+        tool_args_json: str | None = None,
     ) -> None:
         existing = read_form_section(finish_form_path, marker_name="STAGE4_TOOL_CALLS") or ""
         if existing == "`待填写`":
             existing = ""
 
-        args_str = json.dumps(tool_args, ensure_ascii=False, indent=2)
+        args_str = tool_args_json if tool_args_json is not None else _dumps(tool_args, indent=True)
         entry = f"""
 ### Iteration {iteration} | Tool: {tool_name}
 **Args:**
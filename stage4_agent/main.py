@@ -9,19 +9,19 @@ import json
 import os
 from getpass import getpass
 from pathlib import Path
-from typing import Any, Mapping, Sequence
+from typing import TYPE_CHECKING, Any, Mapping, Sequence
 import sys
 
-from dotenv import load_dotenv
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 from tool_catalog import load_tool_catalog, merge_tool_catalogs
 from .tools_bridge import create_tools_bridge
 
-# Watcher 集成
-try:
+if TYPE_CHECKING:  # Watcher 仅在 --with-watcher 时按需导入
     from Watcher_Agent.Watcher_agent import WatcherAgent
-except ImportError:  # pragma: no cover
-    WatcherAgent = None  # type: ignore
 
 try:
     from .Executor_agent import Stage4ExecutorAgent
@@ -36,13 +36,26 @@ except ImportError:  # pragma: no cover
 from config import ModelConfig
 
 
-EXIT_COMMANDS = {"exit", "quit", "q"}
+if orjson is not None:
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str
+        ).decode("utf-8")
+else:  # pragma: no cover - stdlib fallback
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=str)
+
+
+EXIT_COMMANDS = frozenset({"exit", "quit", "q"})
 MULTILINE_SENTINEL = "END"
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
-load_dotenv(PROJECT_ROOT / ".env")
 
 DEFAULT_TOOL_CATALOG = load_tool_catalog()
 
@@ -136,17 +149,24 @@ def _ensure_watcher_api_key(cli_api_key: str | None) -> str | None:
     )
 
 
+_BANNER_RULE = "=" * 78 + "\n"
+# 启动横幅与默认工具清单在导入时拼接一次，输出时单次 write
+_BANNER = (
+    _BANNER_RULE
+    + "Stage 4 Execution Agent (DeepSeek)\n"
+    + "输入 'exit' / 'quit' / 'q' 可在任意主提示下退出。\n"
+    + f"多行输入请以单独一行 '{MULTILINE_SENTINEL}' 结束。\n"
+    + _BANNER_RULE
+    + (
+        "默认工具清单：\n" + "".join(f"- {tool}\n" for tool in DEFAULT_TOOL_CATALOG) + _BANNER_RULE
+        if DEFAULT_TOOL_CATALOG
+        else ""
+    )
+)
+
+
 def _print_banner() -> None:
-    print("=" * 78)
-    print("Stage 4 Execution Agent (DeepSeek)")
-    print("输入 'exit' / 'quit' / 'q' 可在任意主提示下退出。")
-    print(f"多行输入请以单独一行 '{MULTILINE_SENTINEL}' 结束。")
-    print("=" * 78)
-    if DEFAULT_TOOL_CATALOG:
-        print("默认工具清单：")
-        for tool in DEFAULT_TOOL_CATALOG:
-            print(f"- {tool}")
-        print("=" * 78)
+    sys.stdout.write(_BANNER)
 
 
 def _prompt_line(prompt: str, *, required: bool = False) -> str | None:
@@ -168,18 +188,28 @@ def _prompt_line(prompt: str, *, required: bool = False) -> str | None:
         print("该字段不能为空，请重新输入。")
 
 
+def _read_input_line() -> str:
+    """读取一行输入；管道/重定向输入时直接读 sys.stdin，省去 input() 的逐行提示与刷新开销。"""
+    if sys.stdin.isatty():
+        return input("> ")
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip("\r\n")
+
+
 def _prompt_multiline(prompt: str, *, required: bool = False) -> str | None:
     while True:
-        print(prompt)
         if required:
-            print(f"(输入完成后请单独输入 '{MULTILINE_SENTINEL}' 结束，或在内容后输入空行结束)")
+            hint = f"(输入完成后请单独输入 '{MULTILINE_SENTINEL}' 结束，或在内容后输入空行结束)"
         else:
-            print("(直接回车留空；如需继续多行输入，可单独输入 'END')")
+            hint = "(直接回车留空；如需继续多行输入，可单独输入 'END')"
+        sys.stdout.write(f"{prompt}\n{hint}\n")
 
         lines: list[str] = []
         while True:
             try:
-                line = input("> ")
+                line = _read_input_line()
             except (EOFError, KeyboardInterrupt) as exc:  # pragma: no cover
                 raise UserExit from exc
 
@@ -211,7 +241,7 @@ def _prompt_json(prompt: str, *, required: bool, expect_mapping: bool | None = N
                 continue
             return None
         try:
-            value = json.loads(raw)
+            value = _loads(raw)
         except json.JSONDecodeError as exc:
             print(f"JSON 解析失败: {exc}")
             continue
@@ -237,7 +267,7 @@ def _collect_sequence(prompt: str, *, required: bool = False) -> list[str] | Non
 
         if stripped.startswith("[") and stripped.endswith("]"):
             try:
-                value = json.loads(stripped)
+                value = _loads(stripped)
             except json.JSONDecodeError as exc:
                 print(f"JSON 解析失败: {exc}")
                 continue
@@ -260,87 +290,191 @@ def _collect_sequence(prompt: str, *, required: bool = False) -> list[str] | Non
         print("至少需要提供一个条目，请重新输入。")
 
 
+def _collect_turn_inputs() -> dict[str, Any]:
+    """依次提示并收集一轮执行所需的全部输入。"""
+    objective = _prompt_line("目标 Objective (可选)> ")
+    context_snapshot = _prompt_multiline("补充上下文 (可选) >", required=False)
+    execution_plan = _prompt_json("Stage 3 执行计划 JSON (必填) >", required=True, expect_mapping=True)
+    meta_analysis = _prompt_multiline("Stage 1 META_ANALYSIS (可选) >", required=False)
+    refined_strategy = _prompt_json("Stage 2 refined_strategy JSON (可选) >", required=False, expect_mapping=True)
+    handover_notes = _prompt_json("Stage 2 handover_notes JSON/数组 (可选) >", required=False, expect_mapping=None)
+    success_criteria = _collect_sequence(
+        "Success Criteria (可选，JSON 数组或使用 '|' 分隔)> ",
+        required=False,
+    )
+    failure_indicators = _collect_sequence(
+        "Failure Indicators (可选，JSON 数组或使用 '|' 分隔)> ",
+        required=False,
+    )
+    required_capabilities = _prompt_json(
+        "Stage 1 required_capabilities JSON 数组 (可选) >",
+        required=False,
+        expect_mapping=False,
+    )
+    timeliness = _prompt_json(
+        "Stage 1 timeliness_and_knowledge_boundary JSON (可选) >",
+        required=False,
+        expect_mapping=True,
+    )
+    external_constraints = _collect_sequence(
+        "执行约束 (可选，JSON 数组或使用 '|' 分隔)> ",
+        required=False,
+    )
+    user_tool_catalog = _collect_sequence(
+        "工具清单 (可选，JSON 数组或使用 '|' 分隔)> ",
+        required=False,
+    )
+    tool_catalog = merge_tool_catalogs(DEFAULT_TOOL_CATALOG, user_tool_catalog)
+    prior_execution_state = _prompt_json(
+        "既有执行状态 prior_execution_state JSON (可选) >",
+        required=False,
+        expect_mapping=True,
+    )
+    evidence_inputs = _prompt_json(
+        "补充证据列表 evidence_inputs JSON 数组 (可选) >",
+        required=False,
+        expect_mapping=False,
+    )
+    attachments = _prompt_json(
+        "附件索引 attachments JSON (可选) >",
+        required=False,
+        expect_mapping=True,
+    )
+    return {
+        "objective": objective,
+        "context_snapshot": context_snapshot,
+        "execution_plan": execution_plan,
+        "meta_analysis": meta_analysis,
+        "refined_strategy": refined_strategy,
+        "handover_notes": handover_notes,
+        "success_criteria": success_criteria,
+        "failure_indicators": failure_indicators,
+        "required_capabilities": required_capabilities,
+        "timeliness": timeliness,
+        "external_constraints": external_constraints,
+        "tool_catalog": tool_catalog,
+        "prior_execution_state": prior_execution_state,
+        "evidence_inputs": evidence_inputs,
+        "attachments": attachments,
+    }
+
+
+class AuditBatcher:
+    """合并 Watcher 审计请求：累计到 batch_size 条或等待 flush_interval 秒后一次性提交。"""
+
+    def __init__(self, watcher_agent: Any, *, batch_size: int = 8, flush_interval: float = 5.0) -> None:
+        self._watcher_agent = watcher_agent
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue: asyncio.Queue[tuple[dict[str, Any], asyncio.Future]] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, payload: dict[str, Any]) -> str:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((payload, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._flush_interval
+            while len(batch) < self._batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            results = await self._watcher_agent.audit_batch_text([payload for payload, _ in batch])
+        except Exception as exc:  # pylint: disable=broad-except
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), text in zip(batch, results):
+            if not future.done():
+                future.set_result(text)
+
+
+async def _run_watcher_audit(audit_batcher: AuditBatcher, **payload: Any) -> None:
+    try:
+        watcher_text = await audit_batcher.submit({"stage_name": "stage4", **payload})
+        sys.stdout.write(f"=== Watcher 建议 ===\n{watcher_text or '<无内容>'}\n{'=' * 78}\n\n")
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"Watcher 调用失败：{exc}\n")
+
+
 async def _interactive_loop(
     agent: Stage4ExecutorAgent,
     *,
     single_run: bool,
     watcher_agent: "WatcherAgent | None" = None,
     tools_bridge: Any | None = None,
+    audit_batcher: AuditBatcher | None = None,
 ) -> None:
     _print_banner()
+    pending_audits: set[asyncio.Task] = set()
 
     while True:
         try:
-            objective = _prompt_line("目标 Objective (可选)> ")
-            context_snapshot = _prompt_multiline("补充上下文 (可选) >", required=False)
-            execution_plan = _prompt_json("Stage 3 执行计划 JSON (必填) >", required=True, expect_mapping=True)
-            meta_analysis = _prompt_multiline("Stage 1 META_ANALYSIS (可选) >", required=False)
-            refined_strategy = _prompt_json("Stage 2 refined_strategy JSON (可选) >", required=False, expect_mapping=True)
-            handover_notes = _prompt_json("Stage 2 handover_notes JSON/数组 (可选) >", required=False, expect_mapping=None)
-            success_criteria = _collect_sequence(
-                "Success Criteria (可选，JSON 数组或使用 '|' 分隔)> ",
-                required=False,
-            )
-            failure_indicators = _collect_sequence(
-                "Failure Indicators (可选，JSON 数组或使用 '|' 分隔)> ",
-                required=False,
-            )
-            required_capabilities = _prompt_json(
-                "Stage 1 required_capabilities JSON 数组 (可选) >",
-                required=False,
-                expect_mapping=False,
-            )
-            timeliness = _prompt_json(
-                "Stage 1 timeliness_and_knowledge_boundary JSON (可选) >",
-                required=False,
-                expect_mapping=True,
-            )
-            external_constraints = _collect_sequence(
-                "执行约束 (可选，JSON 数组或使用 '|' 分隔)> ",
-                required=False,
-            )
-            user_tool_catalog = _collect_sequence(
-                "工具清单 (可选，JSON 数组或使用 '|' 分隔)> ",
-                required=False,
-            )
-            tool_catalog = merge_tool_catalogs(DEFAULT_TOOL_CATALOG, user_tool_catalog)
-            prior_execution_state = _prompt_json(
-                "既有执行状态 prior_execution_state JSON (可选) >",
-                required=False,
-                expect_mapping=True,
-            )
-            evidence_inputs = _prompt_json(
-                "补充证据列表 evidence_inputs JSON 数组 (可选) >",
-                required=False,
-                expect_mapping=False,
-            )
-            attachments = _prompt_json(
-                "附件索引 attachments JSON (可选) >",
-                required=False,
-                expect_mapping=True,
-            )
+            if pending_audits:
+                # Watcher 仍在后台审计时，在线程中收集输入，避免阻塞事件循环
+                inputs = await asyncio.to_thread(_collect_turn_inputs)
+            else:
+                inputs = _collect_turn_inputs()
         except UserExit:
             print("已退出。")
             break
 
+        objective = inputs["objective"]
+        context_snapshot = inputs["context_snapshot"]
+        execution_plan = inputs["execution_plan"]
+        success_criteria = inputs["success_criteria"]
+        failure_indicators = inputs["failure_indicators"]
+        external_constraints = inputs["external_constraints"]
+        refined_strategy = inputs["refined_strategy"]
+        required_capabilities = inputs["required_capabilities"]
+        timeliness = inputs["timeliness"]
+        prior_execution_state = inputs["prior_execution_state"]
+        evidence_inputs = inputs["evidence_inputs"]
+
         print("\n生成执行记录中，请稍候...\n")
         try:
             result_text = await agent.analyze_text(
                 execution_plan=execution_plan,
                 objective=objective,
-                meta_analysis=meta_analysis,
+                meta_analysis=inputs["meta_analysis"],
                 refined_strategy=refined_strategy if isinstance(refined_strategy, Mapping) else None,
-                handover_notes=handover_notes,
+                handover_notes=inputs["handover_notes"],
                 success_criteria=success_criteria,
                 failure_indicators=failure_indicators,
                 required_capabilities=required_capabilities if isinstance(required_capabilities, Sequence) else None,
                 timeliness_and_knowledge_boundary=timeliness if isinstance(timeliness, Mapping) else None,
                 external_constraints=external_constraints,
-                tool_catalog=tool_catalog,
+                tool_catalog=inputs["tool_catalog"],
                 context_snapshot=context_snapshot,
                 prior_execution_state=prior_execution_state if isinstance(prior_execution_state, Mapping) else None,
                 evidence_inputs=evidence_inputs if isinstance(evidence_inputs, Sequence) else None,
-                attachments=attachments,
+                attachments=inputs["attachments"],
                 enable_tool_loop=bool(tools_bridge),
                 tools_bridge=tools_bridge,
                 watcher_agent=watcher_agent,
@@ -351,7 +485,7 @@ async def _interactive_loop(
             if debug_snapshot:
                 print("模型最近一次输出快照:")
                 try:
-                    print(json.dumps(debug_snapshot, ensure_ascii=False, indent=2, default=str))
+                    print(_dumps(debug_snapshot))
                 except TypeError:
                     print(debug_snapshot)
             if single_run:
@@ -359,34 +493,37 @@ async def _interactive_loop(
             continue
 
         separator = "-" * 78
-        print(separator)
-        print(result_text or "<无内容>")
-        print(separator + "\n")
+        sys.stdout.write(f"{separator}\n{result_text or '<无内容>'}\n{separator}\n\n")
 
-        if watcher_agent:
-            print("触发 Watcher 审计中，请稍候...\n")
-            try:
-                watcher_text = await watcher_agent.audit_text(
-                    stage_name="stage4",
-                    objective=objective,
-                    constraints=external_constraints,
-                    execution_plan=execution_plan,
-                    success_criteria=success_criteria,
-                    failure_indicators=failure_indicators,
-                    execution_log=None,
-                    outcome_summary=None,
-                    final_answer_draft=result_text,
-                    context_snapshot=context_snapshot,
-                )
-                print("=== Watcher 建议 ===")
-                print(watcher_text or "<无内容>")
-                print("=" * 78 + "\n")
-            except Exception as exc:  # pylint: disable=broad-except
-                print(f"Watcher 调用失败：{exc}\n")
+        if audit_batcher:
+            audit = _run_watcher_audit(
+                audit_batcher,
+                objective=objective,
+                constraints=external_constraints,
+                execution_plan=execution_plan,
+                success_criteria=success_criteria,
+                failure_indicators=failure_indicators,
+                execution_log=None,
+                outcome_summary=None,
+                final_answer_draft=result_text,
+                context_snapshot=context_snapshot,
+            )
+            if single_run:
+                print("触发 Watcher 审计中，请稍候...\n")
+                await audit
+            else:
+                # 持续交互模式下 Watcher 在后台审计，结果就绪后输出，同时继续收集下一轮输入
+                print("Watcher 审计已在后台进行，结果就绪后将自动输出。\n")
+                task = asyncio.create_task(audit)
+                pending_audits.add(task)
+                task.add_done_callback(pending_audits.discard)
 
         if single_run:
             break
 
+    if pending_audits:
+        await asyncio.gather(*pending_audits)
+
 
 async def _main_async(args: argparse.Namespace) -> None:
     config = ModelConfig(
@@ -400,6 +537,10 @@ async def _main_async(args: argparse.Namespace) -> None:
     tools_bridge = create_tools_bridge()
     watcher_instance = None
     if args.with_watcher:
+        try:
+            from Watcher_Agent.Watcher_agent import WatcherAgent
+        except ImportError:  # pragma: no cover
+            WatcherAgent = None  # type: ignore
         if WatcherAgent is None:
             print("Watcher 依赖未加载，跳过 Watcher。请确认已安装并可导入 Watcher_Agent 包。")
         else:
@@ -415,10 +556,31 @@ async def _main_async(args: argparse.Namespace) -> None:
             except Exception as exc:  # pylint: disable=broad-except
                 print(f"Watcher 初始化失败，已跳过：{exc}")
 
-    await _interactive_loop(agent, single_run=args.once, watcher_agent=watcher_instance, tools_bridge=tools_bridge)
+    audit_batcher = None
+    if watcher_instance is not None:
+        # 单次运行无需等待凑批
+        audit_batcher = AuditBatcher(watcher_instance, flush_interval=0.0 if args.once else 5.0)
+        audit_batcher.start()
+
+    try:
+        await _interactive_loop(
+            agent,
+            single_run=args.once,
+            watcher_agent=watcher_instance,
+            tools_bridge=tools_bridge,
+            audit_batcher=audit_batcher,
+        )
+    finally:
+        if audit_batcher is not None:
+            await audit_batcher.close()
 
 
 def main() -> None:
+    # 行缓冲：多行输出块以单次 write 输出，同时保证管道场景下提示及时可见
+    sys.stdout.reconfigure(line_buffering=True, write_through=False)
+    from dotenv import load_dotenv
+
+    load_dotenv(PROJECT_ROOT / ".env")
     args = _parse_args()
     try:
         asyncio.run(_main_async(args))
@@ -0,0 +1,125 @@
+"""沙箱常驻工作进程。
+
+由 ``CodeSandbox`` 的进程池启动，按行从 stdin 读取 JSON 任务
+``{"bytecode": <base64 的 marshal 代码对象>, "mem": <MB>, "timeout": <秒>}``，
+每个任务 fork 一个子进程执行（父进程已完成解析与编译，这里无需再次解析源码），
+子进程内设置资源限制后运行代码；结果以一行 JSON
+``{"returncode": ..., "stdout": ..., "stderr": ..., "timed_out": ...}`` 写回 stdout。
+复用该进程可省去每次执行的解释器启动与临时文件开销。
+
+本脚本不依赖项目内其他模块，以便在最小化环境中运行。
+"""
+
+import base64
+import json
+import marshal
+import os
+import resource
+import select
+import signal
+import sys
+import time
+
+# 单个流保留的最大字节数，超出部分丢弃（父进程另有截断）
+MAX_CAPTURE_BYTES = 1024 * 1024
+
+
+def _run_in_child(job, out_w, err_w):
+    """在 fork 出的子进程中执行代码，永不返回。"""
+    # stdin 是与父进程通信的任务通道，子进程改用 /dev/null
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(out_w, 1)
+    os.dup2(err_w, 2)
+    try:
+        limit = int(job["mem"]) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        cpu = int(job["timeout"])
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))
+        sys.setrecursionlimit(50)
+
+        exec(marshal.loads(base64.b64decode(job["bytecode"])), {"__name__": "__main__"})
+        print("\n=== 执行成功 ===")
+        exit_code = 0
+    except BaseException as e:  # noqa: BLE001 - 子进程需要捕获一切并汇报
+        print(f"错误: {e}", file=sys.stderr)
+        exit_code = 1
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(exit_code)
+
+
+def _run_job(job):
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(out_r)
+        os.close(err_r)
+        _run_in_child(job, out_w, err_w)
+    os.close(out_w)
+    os.close(err_w)
+
+    buffers = {out_r: bytearray(), err_r: bytearray()}
+    open_fds = [out_r, err_r]
+    deadline = time.monotonic() + float(job["timeout"])
+    timed_out = False
+    while open_fds:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        ready, _, _ = select.select(open_fds, [], [], remaining)
+        for fd in ready:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                open_fds.remove(fd)
+                continue
+            buf = buffers[fd]
+            if len(buf) < MAX_CAPTURE_BYTES:
+                buf.extend(chunk[: MAX_CAPTURE_BYTES - len(buf)])
+
+    # 子进程可能已关闭 stdout/stderr 却仍在运行，管道关闭后继续按同一截止时间等待其退出
+    status = None
+    while not timed_out:
+        waited, status = os.waitpid(pid, os.WNOHANG)
+        if waited:
+            break
+        if time.monotonic() >= deadline:
+            timed_out = True
+            break
+        time.sleep(0.01)
+
+    if timed_out:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        _, status = os.waitpid(pid, 0)
+    os.close(out_r)
+    os.close(err_r)
+
+    return {
+        "returncode": os.waitstatus_to_exitcode(status),
+        "stdout": buffers[out_r].decode("utf-8", errors="replace"),
+        "stderr": buffers[err_r].decode("utf-8", errors="replace"),
+        "timed_out": timed_out,
+    }
+
+
+def main():
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            response = _run_job(json.loads(line))
+        except Exception as e:  # noqa: BLE001 - 任务失败不应终止工作进程
+            response = {"returncode": -1, "stdout": "", "stderr": f"工作进程错误: {e}", "timed_out": False}
+        sys.stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,329 @@
+import ast
+import asyncio
+import base64
+import contextvars
+import dataclasses
+import datetime
+import hashlib
+import io
+import json
+import logging
+import marshal
 import subprocess
-import tempfile
+import threading
 import os
 import resource
+import sys
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from time import time_ns
 from typing import Tuple, Optional
 import traceback
-from RestrictedPython import compile_restricted, safe_builtins, utility_builtins
-import RestrictedPython.Guards
+
+# 禁止直接调用的内置函数（可用于逃逸沙箱或访问文件/解释器内部）
+_BANNED_CALLS = frozenset({
+    '__import__', 'eval', 'exec', 'compile', 'open',
+    'getattr', 'setattr', 'delattr', 'globals', 'locals', 'vars', 'breakpoint',
+})
+# 禁止访问其属性的模块名（子进程包装代码中 sys/resource 已导入，需一并拦截）
+_BANNED_MODULES = frozenset({
+    'os', 'sys', 'subprocess', 'resource', 'shutil', 'socket', 'pickle',
+    'marshal', 'ctypes', 'mmap', 'importlib', 'builtins',
+})
+# 可借以拿到类层级、函数全局变量、内置函数或栈帧的属性；其余双下划线属性
+# （如 super().__init__、obj.__name__、__len__）保持可用
+_BANNED_ATTRIBUTES = frozenset({
+    '__class__', '__base__', '__bases__', '__mro__', '__subclasses__',
+    '__globals__', '__builtins__', '__dict__', '__code__', '__closure__',
+    '__func__', '__self__', '__getattribute__', '__getattr__', '__setattr__',
+    '__delattr__', '__reduce__', '__reduce_ex__', '__init_subclass__',
+    '__import__', '__loader__', '__spec__', '__traceback__',
+    'f_globals', 'f_locals', 'f_builtins', 'f_back', 'f_code',
+    'tb_frame', 'gi_frame', 'gi_code', 'cr_frame', 'cr_code', 'ag_frame', 'ag_code',
+})
+
+
+class _UnsafeCodeError(Exception):
+    """AST 校验发现危险结构。"""
+
+
+class _SecurityVisitor(ast.NodeVisitor):
+    """遍历 AST，拒绝危险调用、危险模块属性访问、可用于逃逸的属性访问以及白名单外的导入。"""
+
+    def __init__(self, allowed_modules) -> None:
+        self.allowed_modules = allowed_modules
+
+    def _check_module(self, name: str | None) -> None:
+        root = (name or '').split('.')[0]
+        if root not in self.allowed_modules:
+            raise _UnsafeCodeError(f"禁止导入模块: {root or '.'}")
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self._check_module(alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        # 相对导入（from . import x）没有可校验的模块名，一律拒绝
+        self._check_module(node.module if node.level == 0 else None)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if isinstance(node.func, ast.Name) and node.func.id in _BANNED_CALLS:
+            raise _UnsafeCodeError(f"危险调用被阻止: {node.func.id}()")
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        if isinstance(node.value, ast.Name) and node.value.id in _BANNED_MODULES:
+            raise _UnsafeCodeError(f"危险模块访问被阻止: {node.value.id}.{node.attr}")
+        if node.attr in _BANNED_ATTRIBUTES:
+            raise _UnsafeCodeError(f"危险属性访问被阻止: .{node.attr}")
+        self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if node.id == '__builtins__':
+            raise _UnsafeCodeError("禁止访问 __builtins__")
+
+
+WORKER_SCRIPT = Path(__file__).with_name('sandbox_worker.py')
+# 子进程启动参数：不继承父进程的其他 fd，并脱离父进程会话；
+# 不使用 preexec_fn，CPython 得以走 vfork 快速路径，避免复制父进程页表
+_SPAWN_OPTIONS = {'close_fds': True, 'pass_fds': (), 'start_new_session': True}
+
+logger = logging.getLogger(__name__)
+
+
+def _make_bounded_print(buffer: io.StringIO, budget: int = 2000):
+    """构造受限 print 的 ``_print_`` 工厂（与 RestrictedPython 的 PrintCollector 接口一致）。
+
+    受限代码中的 ``print(...)`` 被编译为 ``_print_(_getattr_)._call_print(...)``；
+    输出写入 buffer，累计超过 budget 个字符后截断并忽略后续输出。
+    """
+    state = {'remaining': budget, 'truncated': False}
+
+    class _BoundedPrintCollector:
+        def __init__(self, _getattr_=None):
+            self._getattr_ = _getattr_
+
+        def write(self, text: str) -> None:
+            if state['truncated']:
+                return
+            if len(text) > state['remaining']:
+                buffer.write(text[:state['remaining']])
+                buffer.write('\n[Output truncated]\n')
+                state['truncated'] = True
+                return
+            state['remaining'] -= len(text)
+            buffer.write(text)
+
+        def __call__(self) -> str:
+            # 受限代码读取 ``printed`` 变量时调用
+            return buffer.getvalue()
+
+        def _call_print(self, *objects, **kwargs):
+            if kwargs.get('file') is None:
+                kwargs['file'] = self
+            else:
+                self._getattr_(kwargs['file'], 'write')
+            print(*objects, **kwargs)
+
+    return _BoundedPrintCollector
+
+
+async def _run_blocking(func, *args):
+    """在事件循环的默认线程池中执行阻塞调用；当前上下文没有设置任何 ContextVar 时
+    跳过 ``ctx.run`` 包装（``asyncio.to_thread`` 总会包装一层）"""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    if not len(ctx):
+        return await loop.run_in_executor(None, func, *args)
+    return await loop.run_in_executor(None, ctx.run, func, *args)
+
+
+@lru_cache(maxsize=1)
+def _restricted_python():
+    """按需导入 RestrictedPython：仅子进程路径的调用方无需承担其导入开销"""
+    import RestrictedPython
+    import RestrictedPython.Eval
+    import RestrictedPython.Guards
+
+    return RestrictedPython
+
+
+@lru_cache(maxsize=256)
+def _compile_restricted_cached(code: str):
+    """缓存 RestrictedPython 编译结果（代码对象不可变，可安全复用）"""
+    with warnings.catch_warnings():
+        # print 输出由 _print_ 收集，不要求代码读取 printed 变量
+        warnings.filterwarnings('ignore', message=".*never reads 'printed' variable")
+        return _restricted_python().compile_restricted(code, '<sandboxed>', 'exec')
+
+
+@dataclass(frozen=True, slots=True)
+class SandboxResult:
+    """沙箱执行结果；``ts_ns`` 为纳秒时间戳，仅在序列化时格式化"""
+
+    success: bool
+    output: str
+    error: str
+    method: str
+    code_size: int = 0
+    ts_ns: int = 0
+
+    @property
+    def timestamp(self) -> str:
+        return datetime.datetime.fromtimestamp(self.ts_ns / 1e9).isoformat()
+
+    def as_dict(self) -> dict:
+        """兼容旧调用方的字典形式"""
+        result = dataclasses.asdict(self)
+        result["timestamp"] = self.timestamp
+        return result
+
+
+def _sandbox_env() -> dict:
+    """子进程使用的最小化环境变量"""
+    env = os.environ.copy()
+    env['PYTHONPATH'] = ''  # 清空Python路径
+    env['PATH'] = '/usr/bin:/bin'  # 最小化PATH
+    return env
+
+
+class _SandboxWorker:
+    """单个常驻工作进程，通过按行 JSON 的 stdin/stdout 管道收发任务"""
+    
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, '-I', str(WORKER_SCRIPT)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            env=_sandbox_env(),
+            cwd='/tmp',
+            **_SPAWN_OPTIONS,
+        )
+    
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+    
+    def run(self, job: dict) -> dict:
+        self.proc.stdin.write(json.dumps(job, ensure_ascii=False) + "\n")
+        self.proc.stdin.flush()
+        line = self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"沙箱工作进程意外退出（退出码: {self.proc.poll()}）")
+        return json.loads(line)
+    
+    def close(self) -> None:
+        if self.alive:
+            self.proc.kill()
+        self.proc.wait()
+
+
+class _SandboxWorkerPool:
+    """线程安全的工作进程池：按需启动至多 size 个进程，空闲进程复用"""
+    
+    def __init__(self, size: int):
+        self._size = size
+        self._idle: list[_SandboxWorker] = []
+        self._spawned = 0
+        self._closed = False
+        # 进程归还或退出时都会 notify，等待者据此复用空闲进程或补启新进程
+        self._cond = threading.Condition()
+    
+    def _acquire(self) -> _SandboxWorker:
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("沙箱工作进程池已关闭")
+                if self._idle:
+                    return self._idle.pop()
+                if self._spawned < self._size:
+                    self._spawned += 1
+                    break
+                self._cond.wait()
+        # 启动进程较慢，放在锁外进行
+        try:
+            return _SandboxWorker()
+        except BaseException:
+            self._discard()
+            raise
+    
+    def _discard(self) -> None:
+        with self._cond:
+            self._spawned -= 1
+            self._cond.notify()
+    
+    def _release(self, worker: _SandboxWorker) -> None:
+        if worker.alive:
+            with self._cond:
+                if not self._closed:
+                    self._idle.append(worker)
+                    self._cond.notify()
+                    return
+        worker.close()
+        self._discard()
+    
+    def run(self, job: dict) -> dict:
+        worker = self._acquire()
+        try:
+            return worker.run(job)
+        except BaseException:
+            # 协议状态未知，丢弃该进程
+            worker.close()
+            raise
+        finally:
+            self._release(worker)
+    
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._spawned -= len(idle)
+            self._cond.notify_all()
+        for worker in idle:
+            worker.close()
+
 
 class CodeSandbox:
     """安全代码执行沙箱"""
     
-    def __init__(self, timeout: int = 30, memory_limit_mb: int = 256):
+    VALIDATION_CACHE_SIZE = 512
+    
+    def __init__(self, timeout: int = 30, memory_limit_mb: int = 256, worker_pool_size: int = 2):
         self.timeout = timeout
         self.memory_limit_mb = memory_limit_mb
+        # 常驻工作进程池（按需启动），worker_pool_size=0 时每次执行都冷启动子进程
+        self._worker_pool = _SandboxWorkerPool(worker_pool_size) if worker_pool_size > 0 else None
         self.allowed_modules = {
             'math', 'datetime', 'json', 're', 'collections', 
             'itertools', 'functools', 'random', 'statistics',
             'string', 'typing', 'decimal', 'fractions'
         }
+        # 代码哈希 -> (是否安全, 错误信息, 校验时编译并 marshal 的字节码) 的 LRU 缓存
+        self._validation_cache: OrderedDict[bytes, Tuple[bool, str, Optional[bytes]]] = OrderedDict()
+        # 代码哈希 -> marshal 字节码，供未经校验的路径（如 medium 级别）复用编译结果
+        self._bytecode_cache: OrderedDict[bytes, bytes] = OrderedDict()
+        # 子进程执行在线程池中进行，读写 OrderedDict 时需加锁（校验/编译本身在锁外进行）
+        self._cache_lock = threading.Lock()
+    
+    def close(self) -> None:
+        """关闭当前的常驻工作进程；之后再次执行时按需重新启动"""
+        if self._worker_pool is not None:
+            pool, self._worker_pool = self._worker_pool, _SandboxWorkerPool(self._worker_pool._size)
+            pool.close()
     
-    def _create_safe_builtins(self):
-        """创建安全的builtins环境"""
+    def _create_safe_builtins(self, output: io.StringIO):
+        """创建安全的builtins环境，print 输出写入 output"""
+        restricted_python = _restricted_python()
         safe_globals = {
             '__builtins__': {
-                **safe_builtins,
-                **utility_builtins,
+                **restricted_python.safe_builtins,
+                **restricted_python.utility_builtins,
                 'max': max,
                 'min': min,
                 'sum': sum,
@@ -41,63 +339,83 @@ class CodeSandbox:
                 'hasattr': hasattr,
                 'getattr': getattr,
                 'setattr': setattr,
-                # 限制版的print
-                'print': lambda *args, **kwargs: print(*args, **kwargs) 
-                    if len(str(args)) < 1000 else print('[Output truncated]')
-            }
+            },
+            # 受限代码中的 print 经 _print_ 输出到 output
+            '_print_': _make_bounded_print(output),
+            '_getattr_': restricted_python.Guards.safer_getattr,
+            '_getitem_': restricted_python.Eval.default_guarded_getitem,
+            '_getiter_': restricted_python.Eval.default_guarded_getiter,
+            '_iter_unpack_sequence_': restricted_python.Guards.guarded_iter_unpack_sequence,
+            '_unpack_sequence_': restricted_python.Guards.guarded_unpack_sequence,
+            '_write_': restricted_python.Guards.full_write_guard,
         }
         return safe_globals
     
     def _validate_and_sanitize_code(self, code: str) -> Tuple[bool, str, str]:
         """
-        验证并清理代码
+        验证并清理代码（按代码哈希缓存校验结果，重复代码只校验一次）
         返回: (是否安全, 清理后的代码, 错误信息)
         """
-        # 1. 检查危险关键词
-        dangerous_patterns = [
-            r'__import__\s*\(',
-            r'eval\s*\(',
-            r'exec\s*\(',
-            r'compile\s*\(',
-            r'open\s*\(',
-            r'os\.',
-            r'subprocess\.',
-            r'sys\.',
-            r'import\s+os\b',
-            r'import\s+sys\b',
-            r'import\s+subprocess\b',
-            r'import\s+pickle\b',
-            r'import\s+marshal\b',
-            r'from\s+os\s+import',
-            r'rm\s+-rf',
-            r'chmod\s+777',
-            r'import\s+ctypes\b',
-            r'import\s+mmap\b',
-        ]
-        
-        import re
-        for pattern in dangerous_patterns:
-            if re.search(pattern, code, re.IGNORECASE):
-                return False, code, f"危险模式被阻止: {pattern}"
+        code_hash = self._code_hash(code)
+        with self._cache_lock:
+            cached = self._validation_cache.get(code_hash)
+            if cached is not None:
+                self._validation_cache.move_to_end(code_hash)
+        if cached is not None:
+            is_safe, error, _ = cached
+            return is_safe, code, error
         
-        # 2. 限制导入的模块
-        import_statements = re.findall(r'import\s+(\w+)', code)
-        from_statements = re.findall(r'from\s+(\w+)', code)
-        all_imports = set(import_statements + from_statements)
-        
-        for imp in all_imports:
-            if imp not in self.allowed_modules:
-                return False, code, f"禁止导入模块: {imp}"
-        
-        # 3. 限制代码长度（防止DoS）
+        is_safe, code, error, bytecode = self._run_validation(code)
+        with self._cache_lock:
+            self._validation_cache[code_hash] = (is_safe, error, bytecode)
+            if len(self._validation_cache) > self.VALIDATION_CACHE_SIZE:
+                self._validation_cache.popitem(last=False)
+        return is_safe, code, error
+    
+    @staticmethod
+    def _code_hash(code: str) -> bytes:
+        return hashlib.blake2b(code.encode('utf-8'), digest_size=16).digest()
+    
+    def _run_validation(self, code: str) -> Tuple[bool, str, str, Optional[bytes]]:
+        """执行实际的代码校验，通过时顺带返回由同一棵 AST 编译出的 marshal 字节码"""
+        # 限制代码长度（防止DoS），先于解析执行
         if len(code) > 10000:
-            return False, code, "代码过长（超过10k字符）"
+            return False, code, "代码过长（超过10k字符）", None
+        
+        # 1. 基于 AST 检查危险调用、属性访问与导入白名单（不会误伤字符串/注释中的文本）
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            return False, code, f"语法错误: {e}", None
+        try:
+            _SecurityVisitor(self.allowed_modules).visit(tree)
+        except _UnsafeCodeError as e:
+            return False, code, str(e), None
         
-        # 4. 限制循环和递归
+        # 2. 限制循环和递归
         if 'while True:' in code or 'def factorial' in code:  # 简单示例，实际需要更复杂检测
-            return False, code, "检测到可能的无限循环/递归"
+            return False, code, "检测到可能的无限循环/递归", None
         
-        return True, code, ""
+        return True, code, "", marshal.dumps(compile(tree, '<sandboxed>', 'exec'))
+    
+    def _compile_for_subprocess(self, code: str) -> bytes:
+        """返回交给子进程执行的 marshal 字节码：已校验的代码复用校验时的编译结果，
+        否则（如 medium 级别）在父进程编译一次；语法错误时抛出 SyntaxError"""
+        code_hash = self._code_hash(code)
+        with self._cache_lock:
+            cached = self._validation_cache.get(code_hash)
+            if cached is not None and cached[2] is not None:
+                return cached[2]
+            bytecode = self._bytecode_cache.get(code_hash)
+            if bytecode is not None:
+                self._bytecode_cache.move_to_end(code_hash)
+                return bytecode
+        bytecode = marshal.dumps(compile(code, '<sandboxed>', 'exec'))
+        with self._cache_lock:
+            self._bytecode_cache[code_hash] = bytecode
+            if len(self._bytecode_cache) > self.VALIDATION_CACHE_SIZE:
+                self._bytecode_cache.popitem(last=False)
+        return bytecode
     
     def execute_with_restrictedpython(self, code: str) -> Tuple[bool, str, str]:
         """使用RestrictedPython执行（第一层防护）"""
@@ -107,109 +425,165 @@ class CodeSandbox:
             if not is_safe:
                 return False, "", error
             
-            # 编译限制代码
-            byte_code = compile_restricted(
-                sanitized_code,
-                '<sandboxed>',
-                'exec'
-            )
+            # 编译限制代码（相同代码复用编译结果）
+            byte_code = _compile_restricted_cached(sanitized_code)
             
             # 准备安全环境
-            safe_globals = self._create_safe_builtins()
-            safe_globals['_print_'] = safe_globals['__builtins__']['print']
-            safe_globals['_getiter_'] = RestrictedPython.Guards.guarded_iter
+            output = io.StringIO()
+            safe_globals = self._create_safe_builtins(output)
             
             # 执行
             exec(byte_code, safe_globals)
             
             # 获取结果
-            result = safe_globals.get('_result_', '执行完成（无输出）')
-            return True, str(result), ""
+            if '_result_' in safe_globals:
+                return True, str(safe_globals['_result_']), ""
+            return True, output.getvalue() or '执行完成（无输出）', ""
             
         except Exception as e:
             return False, "", f"RestrictedPython执行错误: {str(e)}"
     
     def execute_with_subprocess(self, code: str) -> Tuple[bool, str, str]:
-        """使用子进程隔离执行（第二层防护）"""
+        """使用子进程隔离执行（第二层防护），优先复用常驻工作进程"""
+        try:
+            bytecode = self._compile_for_subprocess(code)
+        except SyntaxError as e:
+            return False, "", f"语法错误: {e}"
+        if self._worker_pool is None:
+            return self._run_coldstart(bytecode)
         try:
-            # 创建临时文件
-            with tempfile.NamedTemporaryFile(
-                mode='w', 
-                suffix='.py', 
-                delete=False,
-                dir='/tmp'  # 确保在临时目录
-            ) as f:
-                # 写入包装代码
-                wrapper = f'''
+            response = self._worker_pool.run({
+                "bytecode": base64.b64encode(bytecode).decode('ascii'),
+                "mem": self.memory_limit_mb,
+                "timeout": self.timeout,
+            })
+        except (OSError, RuntimeError, ValueError) as e:
+            logger.warning(f"沙箱工作进程不可用，回退到一次性子进程: {e}")
+            return self._run_coldstart(bytecode)
+        
+        if response.get("timed_out"):
+            return False, "", f"执行超时（{self.timeout}秒）"
+        return self._subprocess_outcome(
+            response.get("returncode"), response.get("stdout", ""), response.get("stderr", "")
+        )
+    
+    async def execute_with_subprocess_async(self, code: str) -> Tuple[bool, str, str]:
+        """``execute_with_subprocess`` 的异步版本，不阻塞事件循环，可并发执行多段代码"""
+        if self._worker_pool is not None:
+            # 工作进程池基于线程安全的管道通信，放入线程执行即可并发
+            return await _run_blocking(self.execute_with_subprocess, code)
+        return await self.execute_with_subprocess_coldstart_async(code)
+    
+    @staticmethod
+    def _subprocess_outcome(returncode: int | None, stdout: str, stderr: str) -> Tuple[bool, str, str]:
+        """将子进程退出码与输出转换为 (是否成功, 输出, 错误信息)"""
+        if returncode == 0:
+            output = stdout
+            # 截断过长的输出
+            if len(output) > 2000:
+                output = output[:2000] + "\n...[输出截断]"
+            return True, output, ""
+        return False, "", stderr or f"进程退出码: {returncode}"
+    
+    def _coldstart_command(self) -> list:
+        """一次性子进程的命令行：包装脚本设置资源限制后，从 stdin 读取 marshal 字节码执行"""
+        wrapper = f'''
+import marshal
 import sys
 import resource
 
 # 设置内存限制
 resource.setrlimit(resource.RLIMIT_AS, 
     ({self.memory_limit_mb * 1024 * 1024}, {self.memory_limit_mb * 1024 * 1024}))
-resource.setrlimit(resource.RLIMIT_CPU, (self.timeout, self.timeout))
+# 设置 CPU 时间限制（由内核强制，父进程超时仅作兜底）
+resource.setrlimit(resource.RLIMIT_CPU, ({self.timeout}, {self.timeout}))
+
+_code = marshal.loads(sys.stdin.buffer.read())
 
 # 设置递归深度限制
 sys.setrecursionlimit(50)
 
 # 安全执行用户代码
 try:
-    {code}
+    exec(_code, {{"__name__": "__main__"}})
     print("\\n=== 执行成功 ===")
 except Exception as e:
-    print(f"错误: {{e}}")
+    print(f"错误: {{e}}", file=sys.stderr)
     sys.exit(1)
 '''
-                f.write(wrapper)
-                temp_file = f.name
-            
-            # 设置安全环境变量
-            env = os.environ.copy()
-            env['PYTHONPATH'] = ''  # 清空Python路径
-            env['PATH'] = '/usr/bin:/bin'  # 最小化PATH
-            
-            # 执行子进程
+        return [sys.executable, '-I', '-u', '-c', wrapper]
+    
+    def execute_with_subprocess_coldstart(self, code: str) -> Tuple[bool, str, str]:
+        """每次启动新的 Python 子进程执行（无工作进程池时的回退路径）"""
+        try:
+            bytecode = self._compile_for_subprocess(code)
+        except SyntaxError as e:
+            return False, "", f"语法错误: {e}"
+        return self._run_coldstart(bytecode)
+    
+    def _run_coldstart(self, bytecode: bytes) -> Tuple[bool, str, str]:
+        try:
+            # 执行子进程，字节码经 stdin 传入
             result = subprocess.run(
-                ['python3', temp_file],
+                self._coldstart_command(),
+                input=bytecode,
                 capture_output=True,
-                text=True,
                 timeout=self.timeout,
-                env=env,
+                env=_sandbox_env(),
                 cwd='/tmp',  # 工作目录设为临时目录
+                **_SPAWN_OPTIONS,
+            )
+            return self._subprocess_outcome(
+                result.returncode,
+                result.stdout.decode('utf-8', errors='replace'),
+                result.stderr.decode('utf-8', errors='replace'),
             )
-            
-            # 清理临时文件
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
-            
-            # 检查结果
-            if result.returncode == 0:
-                output = result.stdout
-                # 截断过长的输出
-                if len(output) > 2000:
-                    output = output[:2000] + "\n...[输出截断]"
-                return True, output, ""
-            else:
-                error_msg = result.stderr or f"进程退出码: {result.returncode}"
-                return False, "", error_msg
                 
         except subprocess.TimeoutExpired:
             return False, "", f"执行超时（{self.timeout}秒）"
         except Exception as e:
             return False, "", f"子进程执行错误: {str(e)}"
     
-    def execute(self, code: str, isolation_level: str = "high") -> dict:
+    async def execute_with_subprocess_coldstart_async(self, code: str) -> Tuple[bool, str, str]:
+        """``execute_with_subprocess_coldstart`` 的异步版本"""
+        proc = None
+        try:
+            bytecode = self._compile_for_subprocess(code)
+            proc = await asyncio.create_subprocess_exec(
+                *self._coldstart_command(),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=_sandbox_env(),
+                cwd='/tmp',
+                **_SPAWN_OPTIONS,
+            )
+            stdout, stderr = await asyncio.wait_for(proc.communicate(bytecode), timeout=self.timeout)
+            return self._subprocess_outcome(
+                proc.returncode,
+                stdout.decode('utf-8', errors='replace'),
+                stderr.decode('utf-8', errors='replace'),
+            )
+        except SyntaxError as e:
+            return False, "", f"语法错误: {e}"
+        except asyncio.TimeoutError:
+            if proc is not None and proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            return False, "", f"执行超时（{self.timeout}秒）"
+        except Exception as e:
+            return False, "", f"子进程执行错误: {str(e)}"
+    
+    def execute(self, code: str, isolation_level: str = "high") -> SandboxResult:
         """
         执行代码
         isolation_level: "low"（仅RestrictedPython）, 
                        "medium"（仅子进程）, 
                        "high"（双重保护）
+        "high" 仅做 AST 校验后交给子进程执行，不经过 RestrictedPython 编译，
+        结果中的 method 为 "subprocess+validation"。
         """
         # 记录执行日志（审计用）
-        import logging
-        logger = logging.getLogger(__name__)
         logger.info(f"沙箱执行代码，长度: {len(code)}, 隔离级别: {isolation_level}")
         
         if isolation_level == "low":
@@ -220,22 +594,47 @@ except Exception as e:
             # 先用RestrictedPython验证
             is_safe, _, error = self._validate_and_sanitize_code(code)
             if not is_safe:
-                return {
-                    "success": False,
-                    "output": "",
-                    "error": f"代码验证失败: {error}",
-                    "method": "validation"
-                }
+                return self._validation_failure(code, error)
             
             # 再用子进程执行
             success, output, error = self.execute_with_subprocess(code)
-            method = "subprocess+validation"
         
-        return {
-            "success": success,
-            "output": output,
-            "error": error,
-            "method": method if isolation_level == "high" else isolation_level,
-            "code_size": len(code),
-            "timestamp": datetime.datetime.now().isoformat()
-        }
+        return self._build_result(code, isolation_level, success, output, error)
+    
+    async def execute_async(self, code: str, isolation_level: str = "high") -> SandboxResult:
+        """``execute`` 的异步版本：子进程执行不阻塞事件循环，可用 ``asyncio.gather`` 并发多段代码"""
+        logger.info(f"沙箱异步执行代码，长度: {len(code)}, 隔离级别: {isolation_level}")
+        
+        if isolation_level == "low":
+            success, output, error = self.execute_with_restrictedpython(code)
+        elif isolation_level == "medium":
+            success, output, error = await self.execute_with_subprocess_async(code)
+        else:  # high - 双重防护
+            is_safe, _, error = self._validate_and_sanitize_code(code)
+            if not is_safe:
+                return self._validation_failure(code, error)
+            success, output, error = await self.execute_with_subprocess_async(code)
+        
+        return self._build_result(code, isolation_level, success, output, error)
+    
+    @staticmethod
+    def _validation_failure(code: str, error: str) -> SandboxResult:
+        return SandboxResult(
+            success=False,
+            output="",
+            error=f"代码验证失败: {error}",
+            method="validation",
+            code_size=len(code),
+            ts_ns=time_ns(),
+        )
+    
+    @staticmethod
+    def _build_result(code: str, isolation_level: str, success: bool, output: str, error: str) -> SandboxResult:
+        return SandboxResult(
+            success=success,
+            output=output,
+            error=error,
+            method="subprocess+validation" if isolation_level == "high" else isolation_level,
+            code_size=len(code),
+            ts_ns=time_ns(),
+        )
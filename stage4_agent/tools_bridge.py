@@ -1,17 +1,29 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import ast
 import asyncio
+import atexit
+import concurrent.futures
+import functools
 import inspect
-import io
+import math
 import os
 import sys
 import textwrap
+import threading
+import time
 import traceback
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Callable, Coroutine
 
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional speedup
+    uvloop = None
+
 # 导入沙箱模块
 from .sandboxed_code_interpreter import CodeSandbox
 
@@ -20,7 +32,7 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ToolResult:
     success: bool
     output: str
@@ -29,7 +41,9 @@ class ToolResult:
 
 class ToolRegistry:
     _instance = None
-    _tools: dict[str, Callable] = {}
+    # 工具名 -> (函数, 是否为协程函数)，注册时预先判定，调用时无需再检查
+    _tools: dict[str, tuple[Callable, bool]] = {}
+    # 工具文档按需计算并缓存，注册时不调用 inspect.getdoc
     _tool_docs: dict[str, str] = {}
 
     def __new__(cls):
@@ -41,11 +55,26 @@ class ToolRegistry:
 
     def register(self, func: Callable) -> Callable:
         name = func.__name__
-        self._tools[name] = func
-        self._tool_docs[name] = inspect.getdoc(func) or ""
+        self._tools[name] = (func, inspect.iscoroutinefunction(func))
+        self._tool_docs.pop(name, None)
         return func
 
+    def doc(self, name: str) -> str:
+        """返回工具文档（首次访问时计算）；未知工具返回空字符串"""
+        doc = self._tool_docs.get(name)
+        if doc is None:
+            entry = self._tools.get(name)
+            if entry is None:
+                return ""
+            doc = self._tool_docs[name] = inspect.getdoc(entry[0]) or ""
+        return doc
+
     def get(self, name: str) -> Callable | None:
+        entry = self._tools.get(name)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, name: str) -> tuple[Callable, bool] | None:
+        """返回 (函数, 是否为协程函数)"""
         return self._tools.get(name)
 
     def list_tools(self) -> list[str]:
@@ -54,6 +83,51 @@ class ToolRegistry:
 
 registry = ToolRegistry()
 
+# ToolsBridge 后台事件循环默认线程池的线程数
+_BRIDGE_EXECUTOR_WORKERS = 4
+
+# 错误信息中保留的 traceback 帧数（取最靠近异常抛出处的帧）
+_TRACEBACK_FRAME_LIMIT = 10
+
+
+def _format_traceback(exc: BaseException) -> str:
+    """格式化异常的 traceback，仅保留最后若干帧，避免深调用栈产生过长的错误信息"""
+    return "".join(
+        traceback.format_exception(type(exc), exc, exc.__traceback__, limit=-_TRACEBACK_FRAME_LIMIT)
+    )
+
+# 进程内的搜索/抓取结果缓存：键 -> (写入时间, 结果)，按 LRU 淘汰，超过 TTL 视为失效
+_CACHE_TTL = 3600
+# web_scrape 返回内容（含标题行）的最大字符数
+_SCRAPE_OUTPUT_LIMIT = 5000
+_CACHE_MAX_ENTRIES = 256
+_SEARCH_CACHE: OrderedDict[tuple, tuple[float, ToolResult]] = OrderedDict()
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+
+def _cache_get(key: tuple) -> ToolResult | None:
+    with _SEARCH_CACHE_LOCK:
+        entry = _SEARCH_CACHE.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at >= _CACHE_TTL:
+            del _SEARCH_CACHE[key]
+            return None
+        _SEARCH_CACHE.move_to_end(key)
+        return result
+
+
+def _cache_put(key: tuple, result: ToolResult) -> None:
+    # 只缓存成功结果，失败（如限流、网络错误）下次仍会重试
+    if not result.success:
+        return
+    with _SEARCH_CACHE_LOCK:
+        _SEARCH_CACHE[key] = (time.monotonic(), result)
+        _SEARCH_CACHE.move_to_end(key)
+        while len(_SEARCH_CACHE) > _CACHE_MAX_ENTRIES:
+            _SEARCH_CACHE.popitem(last=False)
+
 
 def tool(func: Callable) -> Callable:
     registry.register(func)
@@ -64,6 +138,13 @@ class ToolsBridge:
     def __init__(self):
         self._tavily_tool = None
         self._tavily_initialized = False
+        self._tavily_lock: asyncio.Lock | None = None
+        self._firecrawl_client = None
+        self._firecrawl_lock: asyncio.Lock | None = None
+        # 常驻后台事件循环（首次调用异步工具时启动），所有工具协程在其上运行
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: threading.Thread | None = None
+        self._loop_lock = threading.Lock()
         # 持久化的代码执行命名空间，跨多次 code_interpreter 调用保持状态
         self._interpreter_globals: dict[str, Any] = {"__builtins__": __builtins__}
         
@@ -71,10 +152,12 @@ class ToolsBridge:
         sandbox_timeout = int(os.getenv("SANDBOX_TIMEOUT", "30"))
         sandbox_memory = int(os.getenv("SANDBOX_MEMORY_MB", "256"))
         isolation_level = os.getenv("SANDBOX_ISOLATION_LEVEL", "high")
+        sandbox_pool_size = int(os.getenv("SANDBOX_POOL_SIZE", "2"))
         
         self.code_sandbox = CodeSandbox(
             timeout=sandbox_timeout,
-            memory_limit_mb=sandbox_memory
+            memory_limit_mb=sandbox_memory,
+            worker_pool_size=sandbox_pool_size,
         )
         self.isolation_level = isolation_level
         self.sandbox_execution_count = 0
@@ -83,34 +166,95 @@ class ToolsBridge:
         """重置代码解释器的命名空间，清除所有已定义的变量和函数"""
         self._interpreter_globals = {"__builtins__": __builtins__}
 
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                # 后台循环由 ToolsBridge 独占，可直接使用 uvloop，不改变全局事件循环策略
+                loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+                # 协程内的阻塞调用（如沙箱执行转入线程的调用）复用同一个常驻线程池，
+                # 随 loop.close() 一并关闭
+                loop.set_default_executor(
+                    concurrent.futures.ThreadPoolExecutor(
+                        max_workers=_BRIDGE_EXECUTOR_WORKERS, thread_name_prefix="toolsbridge"
+                    )
+                )
+                thread = threading.Thread(
+                    target=loop.run_forever, name="ToolsBridgeLoop", daemon=True
+                )
+                thread.start()
+                self._loop, self._loop_thread = loop, thread
+                # close() 会注销该钩子，已关闭的 ToolsBridge 不会被 atexit 一直引用
+                atexit.register(self.close)
+            return self._loop
+
+    def close(self) -> None:
+        """停止后台事件循环线程，释放 Firecrawl 客户端与沙箱常驻工作进程；之后再次调用工具时按需重建"""
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+            client, self._firecrawl_client = self._firecrawl_client, None
+            self._firecrawl_lock = None
+        atexit.unregister(self.close)
+        self.code_sandbox.close()
+        if loop is None:
+            return
+        aclose = getattr(client, "aclose", None)
+        if aclose is not None and thread is not threading.current_thread():
+            try:
+                asyncio.run_coroutine_threadsafe(aclose(), loop).result(timeout=5)
+            except Exception as e:
+                print(f"[ToolsBridge] Firecrawl client close failed: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        loop.close()
+
     def _run_async(self, coro: Coroutine) -> Any:
-        try:
-            asyncio.get_running_loop()
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, coro)
-                return future.result()
-        except RuntimeError:
-            return asyncio.run(coro)
+        """在后台事件循环上运行协程并同步等待结果，避免每次调用新建线程与事件循环"""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._loop_thread:
+            coro.close()
+            raise RuntimeError("ToolsBridge._run_async 不能在其后台事件循环线程内调用")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
 
     async def _init_tavily(self):
         if self._tavily_initialized:
             return
-        try:
-            from MCP.tavily import get_default_tavily_search_tool
-            self._tavily_tool = await get_default_tavily_search_tool(wrap_tool_result=True)
-        except Exception as e:
-            self._tavily_tool = None
-            print(f"[ToolsBridge] Tavily init failed: {e}")
-        self._tavily_initialized = True
+        if self._tavily_lock is None:
+            self._tavily_lock = asyncio.Lock()
+        # 并发查询可能同时触发初始化，加锁保证只初始化一次
+        async with self._tavily_lock:
+            if self._tavily_initialized:
+                return
+            try:
+                from MCP.tavily import get_default_tavily_search_tool
+                self._tavily_tool = await get_default_tavily_search_tool(wrap_tool_result=True)
+            except Exception as e:
+                self._tavily_tool = None
+                print(f"[ToolsBridge] Tavily init failed: {e}")
+            self._tavily_initialized = True
+
+    async def _get_firecrawl(self):
+        """返回复用的 Firecrawl 客户端（首次调用时创建；未配置密钥时抛出 ValueError）"""
+        if self._firecrawl_client is not None:
+            return self._firecrawl_client
+        if self._firecrawl_lock is None:
+            # 工具协程均运行在同一后台事件循环上，锁可延迟创建
+            self._firecrawl_lock = asyncio.Lock()
+        async with self._firecrawl_lock:
+            if self._firecrawl_client is None:
+                from MCP.firecrawl import create_firecrawl_client
+                self._firecrawl_client = create_firecrawl_client()
+        return self._firecrawl_client
 
     def call_tool(self, tool_name: str, **kwargs) -> ToolResult:
-        tool_func = registry.get(tool_name)
-        if tool_func is None:
+        entry = registry.get_entry(tool_name)
+        if entry is None:
             return ToolResult(success=False, output="", error=f"Unknown tool: {tool_name}. Available: {registry.list_tools()}")
+        tool_func, is_coroutine = entry
 
         try:
-            if asyncio.iscoroutinefunction(tool_func):
+            if is_coroutine:
                 result = self._run_async(tool_func(self, **kwargs))
             else:
                 result = tool_func(self, **kwargs)
@@ -121,10 +265,35 @@ class ToolsBridge:
             return ToolResult(
                 success=False,
                 output="",
-                error=f"Tool invocation error: {type(e).__name__}: {e}\nArgs: {kwargs}\n--- Traceback ---\n{traceback.format_exc()}",
+                error=f"Tool invocation error: {type(e).__name__}: {e}\nArgs: {kwargs}\n--- Traceback ---\n{_format_traceback(e)}",
             )
 
 
+def _dedup_by_url_title(items: list) -> list:
+    """按归一化后的 (url, title) 去重，结果按归一化 url 排序；每个条目只归一化一次。
+
+    归一化后的字符串经 sys.intern 驻留，重复条目的键只计算一次哈希并按指针比较。
+    """
+    intern = sys.intern
+    keyed = [
+        (
+            intern(str(item.get("url", "")).strip().lower()),
+            intern(str(item.get("title", "")).strip().lower()),
+            item,
+        )
+        for item in items
+    ]
+    keyed.sort(key=lambda entry: entry[0])
+    seen: set[tuple[str, str]] = set()
+    deduped = []
+    for url, title, item in keyed:
+        if (url, title) in seen:
+            continue
+        seen.add((url, title))
+        deduped.append(item)
+    return deduped
+
+
 @tool
 def web_search(
     bridge: ToolsBridge,
@@ -149,35 +318,60 @@ def web_search(
             else:
                 queries.extend(list(fallback_queries))
 
+        selected_provider = provider.lower()
+        if selected_provider == "auto":
+            selected_provider = "firecrawl" if os.getenv("FIRECRAWL_API_KEY") else "tavily"
+        if selected_provider == "firecrawl":
+            search_fn = _search_firecrawl
+        else:
+            search_fn = functools.partial(_search_tavily, bridge)
+
+        # 主查询与后备查询并发发出（限制并发数），按原顺序取结果，满足条件后取消其余请求
+        semaphore = asyncio.Semaphore(4)
+
+        async def _issue(q: str) -> ToolResult:
+            cache_key = ("web_search", selected_provider, q, max_results)
+            res = _cache_get(cache_key)
+            if res is None:
+                try:
+                    async with semaphore:
+                        res = await search_fn(q, max_results)
+                except Exception as e:
+                    # 单个查询失败不影响其他查询的结果
+                    res = ToolResult(success=False, output="", error=f"{type(e).__name__}: {e}")
+                _cache_put(cache_key, res)
+            return res
+
+        tasks = [asyncio.ensure_future(_issue(q)) for q in queries]
         attempts_output: list[str] = []
-        for idx, q in enumerate(queries, 1):
-            selected_provider = provider.lower()
-            if selected_provider == "auto":
-                if os.getenv("FIRECRAWL_API_KEY"):
-                    selected_provider = "firecrawl"
-                elif os.getenv("TAVILY_API_KEY"):
-                    selected_provider = "tavily"
-                else:
-                    selected_provider = "tavily"
-
-            if selected_provider == "firecrawl":
-                res = await _search_firecrawl(q, max_results)
-            else:
-                res = await _search_tavily(bridge, q, max_results)
-
-            if not res.success:
-                return res
+        failures: list[ToolResult] = []
+        try:
+            for idx, (q, task) in enumerate(zip(queries, tasks), 1):
+                res = await task
+                if not res.success:
+                    failures.append(res)
+                    # 成功结果中只附带失败查询的首行错误摘要
+                    summary = (res.error or "").strip().splitlines()[:1]
+                    attempts_output.append(f"[Attempt {idx}] query: {q}\n[Failed] {''.join(summary)}")
+                    continue
 
-            non_empty_lines = [l for l in res.output.splitlines() if l.strip()]
-            attempts_output.append(f"[Attempt {idx}] query: {q}\n{res.output}")
+                non_empty_lines = [l for l in res.output.splitlines() if l.strip()]
+                attempts_output.append(f"[Attempt {idx}] query: {q}\n{res.output}")
 
-            if len(non_empty_lines) >= max(min_results, 1):
-                return ToolResult(success=True, output="\n\n".join(attempts_output))
+                if len(non_empty_lines) >= max(min_results, 1):
+                    return ToolResult(success=True, output="\n\n".join(attempts_output))
+        finally:
+            for task in tasks:
+                task.cancel()
 
+        # 所有查询均失败时才报告错误
+        if len(failures) == len(queries):
+            return failures[0]
         return ToolResult(success=True, output="\n\n".join(attempts_output))
 
     async def _search_tavily(bridge: ToolsBridge, query: str, max_results: int) -> ToolResult:
-        await bridge._init_tavily()
+        if bridge._tavily_tool is None:
+            await bridge._init_tavily()
         if bridge._tavily_tool is None:
             return ToolResult(success=False, output="", error="Tavily not available. Check TAVILY_API_KEY.")
         try:
@@ -185,19 +379,10 @@ def web_search(
             content = getattr(result, "content", str(result))
 
             if isinstance(content, list):
-                seen = set()
-                deduped = []
-                for item in sorted(content, key=lambda x: str(x.get("url", ""))):
-                    url = str(item.get("url", "")).strip().lower()
-                    title = str(item.get("title", "")).strip().lower()
-                    key = (url, title)
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    deduped.append(item)
-                content = deduped
-
-            content_str = str(content).strip()
+                content = _dedup_by_url_title(content)
+                content_str = str(content) if content else ""
+            else:
+                content_str = str(content).strip()
             if not content_str or content_str in ("[]", "{}", "None", "null"):
                 return ToolResult(
                     success=True,
@@ -209,13 +394,12 @@ def web_search(
         except Exception as e:
             return ToolResult(
                 success=False, output="",
-                error=f"Tavily API Error: {type(e).__name__}: {e}\n--- Traceback ---\n{traceback.format_exc()}"
+                error=f"Tavily API Error: {type(e).__name__}: {e}\n--- Traceback ---\n{_format_traceback(e)}"
             )
 
     async def _search_firecrawl(query: str, limit: int) -> ToolResult:
         try:
-            from MCP.firecrawl import create_firecrawl_client
-            client = create_firecrawl_client()
+            client = await bridge._get_firecrawl()
             result = await client.search(query=query, limit=limit)
             if not result.success:
                 return ToolResult(success=False, output="", error=f"Firecrawl API returned error: {result.error}")
@@ -226,19 +410,10 @@ def web_search(
                            f"Possible reasons: query too specific, topic too niche, or no indexed content matches.\n"
                            f"Suggestions: try broader keywords, different phrasing, or alternative search terms."
                 )
-            seen = set()
-            sorted_items = sorted(result.data, key=lambda x: str(x.get("url", "")))
-
             output_lines = []
-            idx = 0
-            for item in sorted_items:
+            for idx, item in enumerate(_dedup_by_url_title(result.data), 1):
                 title = item.get("title", "No title")
                 url = item.get("url", "")
-                key = (url.strip().lower(), title.strip().lower())
-                if key in seen:
-                    continue
-                seen.add(key)
-                idx += 1
                 description = item.get("description", item.get("markdown", ""))[:200]
                 output_lines.append(f"{idx}. {title}")
                 output_lines.append(f"   URL: {url}")
@@ -247,12 +422,12 @@ def web_search(
         except ValueError as e:
             return ToolResult(
                 success=False, output="",
-                error=f"Firecrawl config error: {type(e).__name__}: {e}\n--- Traceback ---\n{traceback.format_exc()}"
+                error=f"Firecrawl config error: {type(e).__name__}: {e}\n--- Traceback ---\n{_format_traceback(e)}"
             )
         except Exception as e:
             return ToolResult(
                 success=False, output="",
-                error=f"Firecrawl API Error: {type(e).__name__}: {e}\n--- Traceback ---\n{traceback.format_exc()}"
+                error=f"Firecrawl API Error: {type(e).__name__}: {e}\n--- Traceback ---\n{_format_traceback(e)}"
             )
 
     return bridge._run_async(_do_search())
@@ -263,8 +438,7 @@ def web_scrape(bridge: ToolsBridge, url: str, format: str = "markdown") -> ToolR
     """网页抓取工具，提取单个网页内容转为Markdown（仅Firecrawl支持）"""
     async def _do_scrape():
         try:
-            from MCP.firecrawl import create_firecrawl_client
-            client = create_firecrawl_client()
+            client = await bridge._get_firecrawl()
             # Firecrawl 场景下强制使用 markdown，避免返回 JSON 结构导致后续解析困难
             formats = ["markdown"]
             result = await client.scrape(url=url, formats=formats)
@@ -282,8 +456,10 @@ def web_scrape(bridge: ToolsBridge, url: str, format: str = "markdown") -> ToolR
                                f"anti-scraping protection, or page is mostly images/media.\n"
                                f"Suggestions: try a different URL, or use web_search to find alternative sources."
                     )
-                output = f"Title: {title}\n\n{content}" if title else content
-                return ToolResult(success=True, output=output[:5000])
+                # 先截断正文再拼接标题，避免为超长页面构造完整副本
+                prefix = f"Title: {title}\n\n" if title else ""
+                output = prefix + content[:max(0, _SCRAPE_OUTPUT_LIMIT - len(prefix))]
+                return ToolResult(success=True, output=output[:_SCRAPE_OUTPUT_LIMIT])
             return ToolResult(
                 success=True,
                 output=f"[No Data] Firecrawl returned empty data array for '{url}'.\n"
@@ -292,32 +468,34 @@ def web_scrape(bridge: ToolsBridge, url: str, format: str = "markdown") -> ToolR
         except ValueError as e:
             return ToolResult(
                 success=False, output="",
-                error=f"Firecrawl config error: {type(e).__name__}: {e}\nSet FIRECRAWL_API_KEY.\n--- Traceback ---\n{traceback.format_exc()}"
+                error=f"Firecrawl config error: {type(e).__name__}: {e}\nSet FIRECRAWL_API_KEY.\n--- Traceback ---\n{_format_traceback(e)}"
             )
         except Exception as e:
             return ToolResult(
                 success=False, output="",
-                error=f"Firecrawl scrape error: {type(e).__name__}: {e}\n--- Traceback ---\n{traceback.format_exc()}"
+                error=f"Firecrawl scrape error: {type(e).__name__}: {e}\n--- Traceback ---\n{_format_traceback(e)}"
             )
 
-    return bridge._run_async(_do_scrape())
+    # Firecrawl 抓取固定使用 markdown 格式，缓存键与 format 参数无关
+    cache_key = ("web_scrape", url, "markdown")
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+    result = bridge._run_async(_do_scrape())
+    _cache_put(cache_key, result)
+    return result
 
 
 @tool
-def code_interpreter(bridge: ToolsBridge, code: str) -> ToolResult:
+async def code_interpreter(bridge: ToolsBridge, code: str) -> ToolResult:
     """Python代码执行工具，用于计算、数据处理和验证。
     
     使用沙箱环境执行代码，确保安全性。
     注意：持久化命名空间功能受限，仅保存安全结果。
     """
-    output_buffer = io.StringIO()
-    error_buffer = io.StringIO()
-    old_stdout, old_stderr = sys.stdout, sys.stderr
-
+    # 代码在沙箱（子进程或 RestrictedPython 的输出缓冲）中执行，输出随结果返回；
+    # 不再替换全局 sys.stdout/sys.stderr，避免并发工具调用或主线程的输出被错误截获
     try:
-        sys.stdout = output_buffer
-        sys.stderr = error_buffer
-
         clean_code = textwrap.dedent(code or "").strip()
         if not clean_code:
             return ToolResult(success=False, output="", error="code_interpreter received empty code snippet")
@@ -325,90 +503,141 @@ def code_interpreter(bridge: ToolsBridge, code: str) -> ToolResult:
         # 使用沙箱执行代码，替代危险的 exec()
         bridge.sandbox_execution_count += 1
         
-        sandbox_result = bridge.code_sandbox.execute(
+        sandbox_result = await bridge.code_sandbox.execute_async(
             code=clean_code,
             isolation_level=bridge.isolation_level
         )
         
-        if not sandbox_result["success"]:
+        if not sandbox_result.success:
             return ToolResult(
                 success=False, 
                 output="", 
-                error=f"沙箱执行失败: {sandbox_result['error']}\n方法: {sandbox_result.get('method', 'unknown')}"
+                error=f"沙箱执行失败: {sandbox_result.error}\n方法: {sandbox_result.method}"
             )
         
-        # 获取沙箱输出
-        sandbox_output = sandbox_result.get("output", "")
+        # 构建输出：沙箱执行信息 + 沙箱输出
+        output_parts = [f"[沙箱执行 - {sandbox_result.method}]"]
+        sandbox_output = sandbox_result.output.strip()
+        if sandbox_output:
+            output_parts.append(sandbox_output)
         
-        stdout_text = output_buffer.getvalue()
-        stderr_text = error_buffer.getvalue()
-
-        # 构建输出
-        output_parts = []
-        
-        # 添加沙箱执行信息
-        output_parts.append(f"[沙箱执行 - {sandbox_result.get('method', 'unknown')}]")
-        
-        # 添加沙箱输出
-        if sandbox_output.strip():
-            output_parts.append(sandbox_output.strip())
-            
-        # 添加本地缓冲区输出（如果有）
-        if stdout_text.strip():
-            output_parts.append(f"本地输出: {stdout_text.strip()}")
-            
-        if stderr_text.strip():
-            output_parts.append(f"本地错误: {stderr_text.strip()}")
-
-        final_output = "\n".join(output_parts) if output_parts else "代码已执行（无输出）"
-        
-        return ToolResult(success=True, output=final_output)
+        return ToolResult(success=True, output="\n".join(output_parts))
 
     except Exception as e:
-        # 错误处理
-        stdout_text = output_buffer.getvalue()
-        stderr_text = error_buffer.getvalue()
-        error_parts = [
-            f"沙箱框架异常: {type(e).__name__}: {e}",
-            f"\n--- Traceback ---\n{traceback.format_exc()}",
-        ]
-        if stdout_text.strip():
-            error_parts.insert(0, f"--- Stdout before error ---\n{stdout_text.strip()}")
-        if stderr_text.strip():
-            error_parts.append(f"--- Stderr ---\n{stderr_text.strip()}")
-        return ToolResult(success=False, output="", error="\n".join(error_parts))
-    finally:
-        sys.stdout = old_stdout
-        sys.stderr = old_stderr
+        return ToolResult(
+            success=False,
+            output="",
+            error=f"沙箱框架异常: {type(e).__name__}: {e}\n\n--- Traceback ---\n{_format_traceback(e)}",
+        )
+
+
+# calculate 的求值环境在导入时构建一次：math 模块的公开名称 + 少量安全内置函数
+_CALC_ENV: dict[str, Any] = {
+    "__builtins__": {},
+    "abs": abs,
+    "round": round,
+    "min": min,
+    "max": max,
+    "sum": sum,
+    "int": int,
+    "float": float,
+}
+_CALC_ENV.update({name: value for name, value in vars(math).items() if not name.startswith("_")})
+
+# 整数运算结果的位数上限（约 3 万位十进制数），防止 9**9**9、1 << 10**12 之类的表达式长时间占用 CPU/内存
+_CALC_MAX_RESULT_BITS = 100_000
+# factorial/comb/perm 参数上限，超出时耗时呈超线性增长
+_CALC_MAX_COMBINATORIC_ARG = 10_000
+
+
+def _check_int_bits(base: Any, exponent: Any, bits_per_unit: float) -> None:
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+        if exponent * bits_per_unit > _CALC_MAX_RESULT_BITS:
+            raise ValueError(f"结果过大（超过 {_CALC_MAX_RESULT_BITS} 位）")
+
+
+def _calc_pow(base: Any, exponent: Any) -> Any:
+    """按实际数值限制整数幂的结果规模；浮点/复数幂溢出时由 OverflowError 兜底"""
+    if isinstance(base, int) and abs(base) > 1:
+        _check_int_bits(base, exponent, math.log2(abs(base)))
+    return base ** exponent
+
+
+def _calc_lshift(value: Any, shift: Any) -> Any:
+    if value:
+        _check_int_bits(value, shift, 1.0)
+    return value << shift
+
+
+def _bounded_combinatoric(func: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(func)
+    def wrapper(*args: Any) -> Any:
+        if any(isinstance(arg, int) and arg > _CALC_MAX_COMBINATORIC_ARG for arg in args):
+            raise ValueError(f"{func.__name__} 的参数不能超过 {_CALC_MAX_COMBINATORIC_ARG}")
+        return func(*args)
+
+    return wrapper
+
+
+for _name in ("factorial", "comb", "perm"):
+    _CALC_ENV[_name] = _bounded_combinatoric(getattr(math, _name))
+
+# 求值时额外可见的受控运算函数；表达式本身不能直接引用这些名称
+_CALC_GLOBALS: dict[str, Any] = {**_CALC_ENV, "_calc_pow": _calc_pow, "_calc_lshift": _calc_lshift}
+
+
+class _GuardBigIntOps(ast.NodeTransformer):
+    """把 ** 与 << 改写为按实际数值检查结果规模的函数调用"""
+
+    _REPLACEMENTS = {ast.Pow: "_calc_pow", ast.LShift: "_calc_lshift"}
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        helper = self._REPLACEMENTS.get(type(node.op))
+        if helper is None:
+            return node
+        call = ast.Call(func=ast.Name(id=helper, ctx=ast.Load()), args=[node.left, node.right], keywords=[])
+        return ast.copy_location(call, node)
+
+# 表达式中允许出现的 AST 节点：不含属性访问、下标、推导式与 lambda，无法借此逃逸
+_CALC_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.Name, ast.Load, ast.Constant, ast.Tuple, ast.List,
+    ast.operator, ast.unaryop, ast.boolop, ast.cmpop,
+)
+
+
+@functools.lru_cache(maxsize=512)
+def _compile_expression(expression: str):
+    """校验并编译数学表达式（按表达式文本缓存）；不合法时抛出 ValueError/SyntaxError"""
+    tree = ast.parse(expression.strip(), mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, _CALC_ALLOWED_NODES):
+            raise ValueError(f"不支持的表达式元素: {type(node).__name__}")
+        if isinstance(node, ast.Name) and node.id not in _CALC_ENV:
+            raise ValueError(f"未知名称: {node.id}")
+        if isinstance(node, ast.Call) and not isinstance(node.func, ast.Name):
+            raise ValueError("仅允许直接调用数学函数")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, complex)):
+            raise ValueError(f"不支持的字面量: {node.value!r}")
+    tree = ast.fix_missing_locations(_GuardBigIntOps().visit(tree))
+    return compile(tree, "<calc>", "eval")
 
 
 @tool
 def calculate(bridge: ToolsBridge, expression: str) -> ToolResult:
     """数学计算工具，用于安全的数学表达式求值"""
     try:
-        # 使用沙箱执行数学表达式
-        sandbox_result = bridge.code_sandbox.execute(
-            code=f"_result_ = {expression}",
-            isolation_level="low"  # 数学计算用低隔离级别
-        )
-        
-        if sandbox_result["success"]:
-            output = sandbox_result.get("output", "")
-            # 提取计算结果
-            import re
-            numbers = re.findall(r'-?\d+\.?\d*', output)
-            if numbers:
-                return ToolResult(success=True, output=numbers[0])
-            return ToolResult(success=True, output=output[:200])
-        else:
-            return ToolResult(
-                success=False, output="",
-                error=f"计算错误: {sandbox_result.get('error', '未知错误')}"
-            )
+        try:
+            code_obj = _compile_expression(expression)
+            result = eval(code_obj, _CALC_GLOBALS)
+        except (SyntaxError, ValueError, TypeError, ArithmeticError) as e:
+            return ToolResult(success=False, output="", error=f"计算错误: {e}")
+        return ToolResult(success=True, output=str(result)[:200])
     except Exception as e:
         return ToolResult(
             success=False, output="",
-            error=f"Calculate框架错误: {type(e).__name__}: {e}\n--- Traceback ---\n{traceback.format_exc()}"
+            error=f"Calculate框架错误: {type(e).__name__}: {e}\n--- Traceback ---\n{_format_traceback(e)}"
         )
 
 
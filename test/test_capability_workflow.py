@@ -16,23 +16,24 @@ class StubStageOneAgent:
     def __init__(self, message: str) -> None:
         self._message = message
         self.analyze_calls: list[dict[str, object]] = []
-
-    async def analyze(self, **kwargs: object) -> ChatResponse:
-        self.analyze_calls.append(dict(kwargs))
-        payload = AgentPayload(message=self._message, data={"reasoning": "stub"})
+        # 负载不随调用变化，信封只需序列化一次
+        self._payload = AgentPayload(message=message, data={"reasoning": "stub"})
         envelope = build_agent_envelope(
-            payload,
+            self._payload,
             agent_name=self.agent_name,
             stage=self.agent_stage,
             function=self.agent_function,
             model_name="stub-metacog-model",
             tags={"metacognitive": "true"},
         )
-        metadata = {"_agent_envelope": envelope_to_dict(envelope, exclude_none=True)}
+        self._envelope_dict = envelope_to_dict(envelope, exclude_none=True)
+
+    async def analyze(self, **kwargs: object) -> ChatResponse:
+        self.analyze_calls.append(kwargs)
         return ChatResponse(
             content=(ResponseBlock(type="text", text=self._message),),
-            payload=payload,
-            metadata=metadata,
+            payload=self._payload,
+            metadata={"_agent_envelope": self._envelope_dict},
         )
 
 
@@ -45,7 +46,7 @@ class StubCapabilityUpgradeAgent:
         self.evaluate_calls: list[dict[str, object]] = []
 
     async def evaluate(self, **kwargs: object) -> ChatResponse:
-        self.evaluate_calls.append(dict(kwargs))
+        self.evaluate_calls.append(kwargs)
         text = f"Capabilities refreshed using: {kwargs.get('metacognitive_report')}"
         return ChatResponse(content=(ResponseBlock(type="text", text=text),))
 
@@ -73,3 +74,29 @@ async def test_workflow_ingests_stage_one_envelope() -> None:
     assert "阶段一分析结果" in report
     assert "请更新知识库" in report
 
+
+
+class PreparingCapabilityUpgradeAgent(StubCapabilityUpgradeAgent):
+    def __init__(self) -> None:
+        super().__init__()
+        self.prepare_calls: list[dict[str, object]] = []
+
+    async def prepare(self, **kwargs: object) -> None:
+        self.prepare_calls.append(kwargs)
+
+
+@pytest.mark.asyncio
+async def test_workflow_runs_optional_prepare_hook() -> None:
+    capability_agent = PreparingCapabilityUpgradeAgent()
+    workflow = CapabilityUpgradeWorkflow(
+        stage_one_agent=StubStageOneAgent("阶段一分析结果：需要新增能力。"),
+        capability_agent=capability_agent,
+    )
+
+    await workflow.run(
+        analyze_kwargs={"objective": "能力库更新需求评估"},
+        capability_kwargs={"suspected_new_capabilities": ["capability_y"]},
+    )
+
+    assert capability_agent.prepare_calls == [{"suspected_new_capabilities": ["capability_y"]}]
+    assert "需要新增能力" in capability_agent.evaluate_calls[-1]["metacognitive_report"]
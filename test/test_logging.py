@@ -1,93 +1,90 @@
 #!/usr/bin/env python
 # coding: utf-8
 
-# In[ ]:
-
-
 import json
 import logging
-import tempfile
-from pathlib import Path
+
+import pytest
+
 from config import setup_logging, get_logger, TraceContext
 
-def test_logging_configuration():
+
+@pytest.fixture(scope="module")
+def log_dir(tmp_path_factory):
+    """整个模块共用的日志目录"""
+    return tmp_path_factory.mktemp("logs")
+
+
+@pytest.fixture
+def configure_logging(log_dir):
+    """按名称在共享目录中配置日志文件，测试结束后关闭并移除根 logger 的处理器"""
+    def _configure(name, **kwargs):
+        log_file = log_dir / f"{name}.log"
+        setup_logging(log_file=str(log_file), enable_console=False, **kwargs)
+        return log_file
+
+    yield _configure
+
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers:
+        handler.close()
+    root_logger.handlers.clear()
+    root_logger.filters.clear()
+
+
+@pytest.mark.parametrize("format_type", ["text", "json"])
+def test_logging_configuration(configure_logging, format_type):
     """测试日志配置"""
-    # 测试文本格式
-    with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
-        log_file = f.name
-    
-    try:
-        setup_logging(level="DEBUG", format_type="text", log_file=log_file)
-        logger = get_logger("test")
-        
-        logger.debug("Debug 消息")
-        logger.info("Info 消息")
-        logger.warning("Warning 消息")
-        logger.error("Error 消息")
-        
-        # 检查文件内容
-        content = Path(log_file).read_text()
-        assert "Debug 消息" in content
-        assert "Info 消息" in content
-        
-    finally:
-        Path(log_file).unlink()
-
-def test_json_logging():
+    log_file = configure_logging(f"config_{format_type}", level="DEBUG", format_type=format_type)
+    logger = get_logger(f"test_{format_type}")
+
+    logger.debug("Debug 消息")
+    logger.info("Info 消息")
+    logger.warning("Warning 消息")
+    logger.error("Error 消息")
+
+    # 检查文件内容
+    content = log_file.read_text(encoding="utf-8")
+    assert "Debug 消息" in content
+    assert "Info 消息" in content
+
+
+def test_json_logging(configure_logging):
     """测试 JSON 格式日志"""
-    with tempfile.NamedTemporaryFile(mode='w', delete=False) as f:
-        log_file = f.name
-    
-    try:
-        setup_logging(level="INFO", format_type="json", log_file=log_file)
-        logger = get_logger("test_json")
-        
-        with TraceContext("test-trace-123"):
-            logger.info("带 trace_id 的日志")
-        
-        # 检查 JSON 格式
-        lines = Path(log_file).read_text().strip().split('\n')
-        for line in lines:
-            if line:
-                log_entry = json.loads(line)
-                assert "timestamp" in log_entry
-                assert "level" in log_entry
-                assert "message" in log_entry
-                
-                if "带 trace_id 的日志" in line:
-                    assert log_entry.get("trace_id") == "test-trace-123"
-        
-    finally:
-        Path(log_file).unlink()
-
-def test_log_rotation():
+    log_file = configure_logging("trace", level="INFO", format_type="json")
+    logger = get_logger("test_json")
+
+    with TraceContext("test-trace-123"):
+        logger.info("带 trace_id 的日志")
+
+    # 检查 JSON 格式
+    lines = log_file.read_text(encoding="utf-8").strip().split('\n')
+    for line in lines:
+        if line:
+            log_entry = json.loads(line)
+            assert "timestamp" in log_entry
+            assert "level" in log_entry
+            assert "message" in log_entry
+
+            if "带 trace_id 的日志" in line:
+                assert log_entry.get("trace_id") == "test-trace-123"
+
+
+def test_log_rotation(configure_logging):
     """测试日志轮转"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        log_file = Path(tmpdir) / "test.log"
-        
-        setup_logging(
-            level="INFO",
-            format_type="text",
-            log_file=str(log_file),
-            max_bytes=100,  # 很小的限制，便于测试轮转
-            backup_count=2
-        )
-        
-        logger = get_logger("test_rotation")
-        
-        # 写入大量日志触发轮转
-        for i in range(100):
-            logger.info(f"测试日志消息 {i}")
-        
-        # 检查是否创建了备份文件
-        backup_files = list(log_file.parent.glob(f"{log_file.name}.*"))
-        assert len(backup_files) <= 2  # 不超过 backup_count
-        
-        print("所有日志测试通过")
-
-if __name__ == "__main__":
-    test_logging_configuration()
-    test_json_logging()
-    test_log_rotation()
-    print("所有测试通过")
+    log_file = configure_logging(
+        "rotation",
+        level="INFO",
+        format_type="text",
+        max_bytes=100,  # 很小的限制，便于测试轮转
+        backup_count=2,
+    )
+    logger = get_logger("test_rotation")
+
+    # 写入大量日志触发轮转
+    for i in range(100):
+        logger.info(f"测试日志消息 {i}")
 
+    # 检查是否创建了备份文件
+    backup_files = list(log_file.parent.glob(f"{log_file.name}.*"))
+    assert 0 < len(backup_files) <= 2  # 不超过 backup_count
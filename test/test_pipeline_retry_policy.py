@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from workflow.full_pipeline_runner import RetryPolicy, _is_retryable
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://example.invalid/v1/chat/completions")
+    response = httpx.Response(status, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+class _FlakyCall:
+    """前若干次调用抛出给定异常，之后返回 "ok" 的桩调用。"""
+
+    def __init__(self, exc: Exception, failures: int) -> None:
+        self._exc = exc
+        self._failures = failures
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        if self.calls <= self._failures:
+            raise self._exc
+        return "ok"
+
+
+def test_is_retryable_classifies_errors() -> None:
+    assert _is_retryable(httpx.ConnectError("boom"))
+    assert _is_retryable(_status_error(503))
+    assert _is_retryable(_status_error(429))
+    assert not _is_retryable(_status_error(400))
+    assert not _is_retryable(ValueError("bad payload"))
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_retries_on_503(monkeypatch: pytest.MonkeyPatch) -> None:
+    delays: list[float] = []
+
+    async def _fake_sleep(delay: float) -> None:
+        delays.append(delay)
+
+    monkeypatch.setattr("workflow.full_pipeline_runner.asyncio.sleep", _fake_sleep)
+    call = _FlakyCall(_status_error(503), failures=2)
+
+    assert await RetryPolicy(attempts=3).call("stage", call) == "ok"
+    assert call.calls == 3
+    assert len(delays) == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_fails_fast_on_400() -> None:
+    call = _FlakyCall(_status_error(400), failures=1)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await RetryPolicy(attempts=3).call("stage", call)
+    assert call.calls == 1
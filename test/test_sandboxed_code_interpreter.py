@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import textwrap
+import threading
+import time
+
+import pytest
+
+import stage4_agent.sandboxed_code_interpreter as sandbox_module
+from stage4_agent.sandboxed_code_interpreter import CodeSandbox
+
+
+@pytest.fixture
+def sandbox() -> CodeSandbox:
+    return CodeSandbox(timeout=5, worker_pool_size=0)
+
+
+def test_validation_allows_harmless_dunders(sandbox: CodeSandbox) -> None:
+    code = textwrap.dedent(
+        """
+        class Base:
+            def __init__(self, name):
+                self.name = name
+
+        class Child(Base):
+            def __init__(self):
+                super().__init__(Child.__name__)
+
+            def __len__(self):
+                return len(self.name)
+
+        result = len(Child())
+        """
+    )
+
+    is_safe, _, error = sandbox._validate_and_sanitize_code(code)
+
+    assert is_safe, error
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "().__class__.__bases__[0].__subclasses__()",
+        "(lambda: 0).__globals__",
+        "(x for x in []).gi_frame.f_builtins",
+    ],
+)
+def test_validation_blocks_escape_attributes(sandbox: CodeSandbox, code: str) -> None:
+    is_safe, _, error = sandbox._validate_and_sanitize_code(code)
+
+    assert not is_safe
+    assert "危险属性访问被阻止" in error
+
+
+def test_worker_enforces_timeout_after_output_streams_close() -> None:
+    sandbox = CodeSandbox(timeout=2, worker_pool_size=1)
+    code = "import sys, time\nsys.stdout.close()\nsys.stderr.close()\ntime.sleep(60)\n"
+    try:
+        result = sandbox.execute(code, isolation_level="medium")
+    finally:
+        sandbox.close()
+
+    assert not result.success
+    assert "执行超时" in result.error
+
+
+class _DyingWorker:
+    """首个实例在任务中途退出的桩工作进程。"""
+
+    instances = 0
+
+    def __init__(self) -> None:
+        type(self).instances += 1
+        self._dies = type(self).instances == 1
+        self.alive = True
+
+    def run(self, job: dict) -> dict:
+        if self._dies:
+            # 等第二个任务进入等待后再退出
+            time.sleep(0.2)
+            self.alive = False
+            raise RuntimeError("worker exited")
+        return {"returncode": 0}
+
+    def close(self) -> None:
+        self.alive = False
+
+
+def test_worker_pool_wakes_waiter_when_busy_worker_dies(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(sandbox_module, "_SandboxWorker", _DyingWorker)
+    _DyingWorker.instances = 0
+    pool = sandbox_module._SandboxWorkerPool(1)
+    outcomes: list[object] = []
+
+    def _run() -> None:
+        try:
+            outcomes.append(pool.run({}))
+        except RuntimeError as exc:
+            outcomes.append(exc)
+
+    threads = [threading.Thread(target=_run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert {"returncode": 0} in outcomes
+    pool.close()
+
+
+def test_restricted_print_is_captured_and_bounded(sandbox: CodeSandbox) -> None:
+    success, output, error = sandbox.execute_with_restrictedpython(
+        "for i in range(3):\n    print('line', i)\n"
+    )
+
+    assert success, error
+    assert output == "line 0\nline 1\nline 2\n"
+
+    success, output, error = sandbox.execute_with_restrictedpython("for i in range(1000):\n    print('x' * 10)\n")
+
+    assert success, error
+    assert output.endswith("[Output truncated]\n")
+    assert len(output) < 2100
+
+
+def test_validation_failure_records_code_size_and_timestamp(sandbox: CodeSandbox) -> None:
+    code = "import os\nos.system('id')"
+    result = sandbox.execute(code)
+    assert not result.success
+    assert result.method == "validation"
+    assert result.code_size == len(code)
+    assert result.ts_ns > 0
+
+
+def test_code_caches_survive_concurrent_threads(sandbox: CodeSandbox, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(CodeSandbox, "VALIDATION_CACHE_SIZE", 8)
+    snippets = [f"x = {i}\nprint(x)" for i in range(64)]
+    errors: list[BaseException] = []
+
+    def worker() -> None:
+        try:
+            for _ in range(20):
+                for code in snippets:
+                    sandbox._validate_and_sanitize_code(code)
+                    sandbox._compile_for_subprocess(code)
+        except BaseException as exc:  # pragma: no cover - 仅在失败时记录
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(sandbox._validation_cache) <= 8
+    assert len(sandbox._bytecode_cache) <= 8
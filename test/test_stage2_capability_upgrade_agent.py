@@ -86,7 +86,19 @@ async def test_stage2_upgrade_agent_applies_fusion_strategy_only(tmp_path: Path,
         """
     ).strip()
 
-    fusion_response = "[Reasoning]\n需要新增融合策略。\n\n" + expected_patch
+    decision_header = textwrap.dedent(
+        """
+        DECISION: APPLY
+        ACTION: create_new
+        CATEGORY: I
+        REFERENCE_IDS: I1, I2
+        coverage_gap: 现有策略无法同时覆盖事实核对与快照对齐
+        reuse_failure: I2 只维护快照，不做跨源验证
+        new_value: 融合证据核对与快照管理
+        REASON: 需要新增融合策略。
+        """
+    ).strip()
+    fusion_response = decision_header + "\n\n" + expected_patch
     refinement_response = "[Reasoning]\n仅建议优化现有策略描述，无需新增策略。"
 
     agent = Stage2CapabilityUpgradeAgent(
@@ -101,7 +113,7 @@ async def test_stage2_upgrade_agent_applies_fusion_strategy_only(tmp_path: Path,
     agent._model = _SequentialStubModel([fusion_response, refinement_response])  # type: ignore[attr-defined]
 
     fusion_report = "Stage 2 Output: refined_strategy -> I1-I2 融合策略"
-    await agent.evaluate_text(metacognitive_report=fusion_report)
+    await agent.evaluate_text(context=fusion_report)
 
     updated_after_fusion = strategy_file.read_text(encoding="utf-8")
     assert expected_patch in updated_after_fusion
@@ -109,15 +121,43 @@ async def test_stage2_upgrade_agent_applies_fusion_strategy_only(tmp_path: Path,
     assert agent.last_applied_path == strategy_file
 
     refinement_report = "Stage 2 Output: refined_strategy -> I2 调整补充信息"
-    await agent.evaluate_text(metacognitive_report=refinement_report)
+    await agent.evaluate_text(context=refinement_report)
 
     updated_after_refinement = strategy_file.read_text(encoding="utf-8")
     assert updated_after_refinement == updated_after_fusion
     assert agent.last_patch_markdown is None
 
-    assert agent._model._index == 2  # type: ignore[attr-defined]
+    # 纯改进报告不含融合信号，预筛直接跳过，第二次不会调用模型
+    assert agent._model._index == 1  # type: ignore[attr-defined]
 
 
+@pytest.mark.asyncio
+async def test_stage2_upgrade_agent_skips_model_without_fusion_signal(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """上下文中没有融合信号时直接返回 SKIP，不调用模型。"""
 
+    strategy_file = tmp_path / "strategy.md"
+    strategy_file.write_text("#### `contextual_snapshot` (I2)\n", encoding="utf-8")
+    monkeypatch.setattr(stage2_module, "STRATEGY_LIBRARY_FILE", strategy_file)
+    monkeypatch.setattr(stage2_module, "STRATEGY_LIBRARY_DIR", strategy_file.parent)
 
+    agent = Stage2CapabilityUpgradeAgent(
+        config=Stage2CapabilityUpgradeConfig(
+            api_key="stub-key",
+            attach_envelope=False,
+            backup_before_write=False,
+            auto_apply_patch=True,
+            library_file=str(strategy_file),
+        )
+    )
+    agent._model = _SequentialStubModel([])  # type: ignore[attr-defined]
+
+    result = await agent.evaluate_text(context="## Stage 2-B Analysis\n\n沿用 I2 并补充时间戳字段。")
+
+    assert result.startswith("DECISION: SKIP")
+    assert agent.last_patch_markdown is None
+    assert agent._model._index == 0  # type: ignore[attr-defined]
+    assert strategy_file.read_text(encoding="utf-8") == "#### `contextual_snapshot` (I2)\n"
 
+    # 缺少 context 时预筛不介入，参数错误照常抛出
+    with pytest.raises(TypeError):
+        await agent.evaluate_text(metacognitive_report="I1-I2 融合策略")
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from dataclasses import replace
+
 import pytest
 
 from context.envelope import build_agent_envelope, envelope_to_dict
@@ -19,25 +21,25 @@ class StubStageOneAgent(StageOneAgentProtocol):
     agent_function = "metacognitive_analysis"
 
     def __init__(self, payload: AgentPayload) -> None:
-        self._payload = payload
         self.calls: list[dict[str, object]] = []
-
-    async def analyze(self, **kwargs: object) -> ChatResponse:
-        self.calls.append(dict(kwargs))
+        # 负载不随调用变化，信封只需序列化一次
         envelope = build_agent_envelope(
-            self._payload,
+            payload,
             agent_name=self.agent_name,
             stage=self.agent_stage,
             function=self.agent_function,
             model_name="stub-stage1-model",
         )
-        metadata = {"_agent_envelope": envelope_to_dict(envelope, exclude_none=True)}
-        return ChatResponse(
-            content=(ResponseBlock(type="text", text=self._payload.message),),
-            payload=self._payload,
-            metadata=metadata,
+        self._response = ChatResponse(
+            content=(ResponseBlock(type="text", text=payload.message),),
+            payload=payload,
+            metadata={"_agent_envelope": envelope_to_dict(envelope, exclude_none=True)},
         )
 
+    async def analyze(self, **kwargs: object) -> ChatResponse:
+        self.calls.append(kwargs)
+        return replace(self._response)
+
 
 class StubStageTwoAgent(StageTwoAgentProtocol):
     agent_name = "StrategySelectionAgent"
@@ -48,7 +50,7 @@ class StubStageTwoAgent(StageTwoAgentProtocol):
         self.calls: list[dict[str, object]] = []
 
     async def analyze(self, **kwargs: object) -> ChatResponse:
-        self.calls.append(dict(kwargs))
+        self.calls.append(kwargs)
         payload = AgentPayload(message="策略评估完成。", data={"received": kwargs})
         envelope = build_agent_envelope(
             payload,
@@ -73,24 +75,24 @@ class StubCandidateAgent(CandidateSelectionAgentProtocol):
     def __init__(self, candidates: list[dict[str, object]]) -> None:
         self._candidates = candidates
         self.calls: list[dict[str, object]] = []
-
-    async def analyze(self, **kwargs: object) -> ChatResponse:
-        self.calls.append(dict(kwargs))
-        payload = AgentPayload(message="候选策略已生成。", data={"candidates": self._candidates})
+        self._payload = AgentPayload(message="候选策略已生成。", data={"candidates": candidates})
         envelope = build_agent_envelope(
-            payload,
+            self._payload,
             agent_name=self.agent_name,
             stage=self.agent_stage,
             function=self.agent_function,
             model_name="stub-candidate-model",
         )
-        metadata = {"_agent_envelope": envelope_to_dict(envelope, exclude_none=True)}
-        return ChatResponse(
+        self._response = ChatResponse(
             content=(ResponseBlock(type="text", text="DONE"),),
-            payload=payload,
-            metadata=metadata,
+            payload=self._payload,
+            metadata={"_agent_envelope": envelope_to_dict(envelope, exclude_none=True)},
         )
 
+    async def analyze(self, **kwargs: object) -> ChatResponse:
+        self.calls.append(kwargs)
+        return replace(self._response)
+
 
 @pytest.mark.asyncio
 async def test_workflow_selects_candidates_and_forwards_payload() -> None:
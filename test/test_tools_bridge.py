@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pytest
+
+import stage4_agent.tools_bridge as tools_bridge_module
+from stage4_agent.tools_bridge import create_tools_bridge
+
+
+@pytest.fixture
+def bridge():
+    tools_bridge = create_tools_bridge()
+    yield tools_bridge
+    tools_bridge.close()
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected"),
+    [
+        ("8 ** (1/3)", 2.0),
+        ("1.05**(12*10)", 1.05 ** 120),
+        ("2 ** (3 + 4)", 128),
+        ("2 ** -1", 0.5),
+    ],
+)
+def test_calculate_accepts_fractional_and_computed_exponents(bridge, expression: str, expected: float) -> None:
+    result = bridge.call_tool("calculate", expression=expression)
+
+    assert result.success, result.error
+    assert float(result.output) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("expression", ["9**9**9", "10 ** (10 ** 6)", "1 << 10**9", "factorial(10**5)"])
+def test_calculate_rejects_oversized_results(bridge, expression: str) -> None:
+    result = bridge.call_tool("calculate", expression=expression)
+
+    assert not result.success
+    assert "计算错误" in result.error
+
+
+def test_close_releases_sandbox_workers_and_atexit_hook(monkeypatch: pytest.MonkeyPatch) -> None:
+    registered: list[object] = []
+    monkeypatch.setattr(tools_bridge_module.atexit, "register", registered.append)
+    monkeypatch.setattr(tools_bridge_module.atexit, "unregister", registered.remove)
+    tools_bridge = create_tools_bridge()
+    tools_bridge._ensure_loop()
+
+    result = tools_bridge.code_sandbox.execute("print(1)", isolation_level="medium")
+    assert result.success, result.error
+    workers = list(tools_bridge.code_sandbox._worker_pool._idle)
+    assert workers
+
+    tools_bridge.close()
+
+    assert not any(worker.alive for worker in workers)
+    assert registered == []
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import json
+
+from Watcher_Agent.Watcher_agent import WatcherAgent
+
+
+def test_split_batch_audit_keeps_braces_inside_advice() -> None:
+    payload = {"1": "Call search with {\"q\": \"x\"} ``` then retry", "2": "ok"}
+    response = f"Here you go:\n```json\n{json.dumps(payload)}\n```\nDone."
+
+    assert WatcherAgent._split_batch_audit(response, 2) == [payload["1"], payload["2"]]
+
+
+def test_split_batch_audit_falls_back_to_full_response() -> None:
+    response = "no json here"
+
+    assert WatcherAgent._split_batch_audit(response, 2) == [response, response]
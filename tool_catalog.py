@@ -6,12 +6,21 @@ Agent 使用的字符串列表（例如传入 ``tool_catalog`` 参数）。
 
 from __future__ import annotations
 
+import os
+import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, Sequence
 
 PROJECT_ROOT = Path(__file__).resolve().parent
 DEFAULT_TOOL_CATALOG_PATH = PROJECT_ROOT / "tools" / "tool_catalog.md"
 
+# 一次扫描识别 ``## 分组`` 标题行与 ``- 条目`` 行（行首空白忽略）
+_CATALOG_LINE_RE = re.compile(
+    r"^[^\S\n]*(?:##+[^\S\n]*(?P<section>[^\n]*?)[^\S\n]*$|- (?P<item>[^\n]*))",
+    re.M,
+)
+
 
 def _ensure_path(path: str | Path) -> Path:
     candidate = Path(path)
@@ -21,17 +30,8 @@ def _ensure_path(path: str | Path) -> Path:
 
 
 def _normalize_entries(items: Iterable[str]) -> list[str]:
-    normalized: list[str] = []
-    seen: set[str] = set()
-    for raw in items:
-        entry = raw.strip()
-        if not entry:
-            continue
-        if entry in seen:
-            continue
-        normalized.append(entry)
-        seen.add(entry)
-    return normalized
+    # dict.fromkeys 按插入顺序去重
+    return list(dict.fromkeys(entry for entry in (raw.strip() for raw in items) if entry))
 
 
 def load_tool_catalog(path: str | Path | None = None) -> list[str]:
@@ -52,30 +52,36 @@ def load_tool_catalog(path: str | Path | None = None) -> list[str]:
 
     target_path = _ensure_path(path) if path else DEFAULT_TOOL_CATALOG_PATH
     try:
-        content = target_path.read_text(encoding="utf-8")
+        stat = os.stat(target_path)
     except FileNotFoundError:
         return []
+    return list(_load_cached(str(target_path), stat.st_mtime_ns, stat.st_size))
+
+
+@lru_cache(maxsize=16)
+def _load_cached(resolved: str, mtime_ns: int, size: int) -> tuple[str, ...]:
+    """按 (路径, 修改时间, 大小) 缓存解析结果，文件变化后自动失效。"""
+
+    try:
+        content = Path(resolved).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return ()
 
     entries: list[str] = []
     current_section: str | None = None
 
-    for line in content.splitlines():
-        stripped = line.strip()
-        if not stripped:
-            continue
-        if stripped.startswith("#"):
-            if stripped.startswith("##"):
-                current_section = stripped.lstrip("#").strip()
-            continue
-        if not stripped.startswith("- "):
+    for match in _CATALOG_LINE_RE.finditer(content):
+        section = match.group("section")
+        if section is not None:
+            current_section = section
             continue
 
-        item = stripped[2:].strip()
+        item = match.group("item").strip()
         if not item:
             continue
 
-        if ":" in item:
-            name, description = item.split(":", 1)
+        name, sep, description = item.partition(":")
+        if sep:
             name = name.strip()
             description = description.strip()
             if current_section:
@@ -88,7 +94,7 @@ def load_tool_catalog(path: str | Path | None = None) -> list[str]:
 
         entries.append(entry)
 
-    return _normalize_entries(entries)
+    return tuple(_normalize_entries(entries))
 
 
 def merge_tool_catalogs(*catalogs: Sequence[str] | None) -> list[str] | None:
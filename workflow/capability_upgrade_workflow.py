@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
 import inspect
 from dataclasses import dataclass
-from typing import Any, AsyncGenerator, Mapping, Protocol
+from typing import Any, AsyncGenerator, Iterable, Iterator, Mapping, Protocol
 
 from context.Context_Orchestrator import (
     ContextOrchestrator,
@@ -28,7 +29,12 @@ class StageOneAgent(Protocol):
 
 
 class CapabilityUpgradeAgentProtocol(Protocol):
-    """Protocol describing the minimal interface required from the capability agent."""
+    """Protocol describing the minimal interface required from the capability agent.
+
+    Agents may additionally expose an optional ``prepare(**kwargs)`` hook (sync or
+    async); the workflow runs it concurrently with context orchestration so that
+    prompt/template warm-up overlaps with report composition.
+    """
 
     agent_name: str
     agent_stage: str
@@ -94,19 +100,28 @@ class CapabilityUpgradeWorkflow:
         if envelope is None:
             raise ValueError("Stage-one agent response did not contain an AgentEnvelope.")
 
-        record_id = self._orchestrator.ingest(envelope)
-        package = self._dispatch_context(
+        capability_inputs = dict(capability_kwargs or {})
+
+        # ingest/dispatch/拼接报告均为同步 CPU 工作，放到线程中执行，
+        # 同时让能力升级 Agent 的可选 prepare 钩子并行预热。
+        report_task = asyncio.to_thread(
+            self._orchestrate_report,
             envelope=envelope,
-            record_id=record_id,
             request_override=context_request,
             analyze_kwargs=analyze_kwargs,
         )
+        prepare = getattr(self._capability_agent, "prepare", None)
+        if callable(prepare):
+            (package, metacognitive_report), _ = await asyncio.gather(
+                report_task,
+                self._call_prepare(prepare, capability_inputs),
+            )
+        else:
+            package, metacognitive_report = await report_task
 
-        metacognitive_report = self._compose_report(package)
         if not metacognitive_report:
             raise ValueError("Failed to compose metacognitive report from orchestrated context.")
 
-        capability_inputs = dict(capability_kwargs or {})
         capability_inputs.setdefault("metacognitive_report", metacognitive_report)
 
         capability_response = await self._capability_agent.evaluate(**capability_inputs)
@@ -117,6 +132,28 @@ class CapabilityUpgradeWorkflow:
             capability_response=capability_response,
         )
 
+    def _orchestrate_report(
+        self,
+        *,
+        envelope: AgentEnvelope,
+        request_override: ContextRequest | None,
+        analyze_kwargs: Mapping[str, Any],
+    ) -> tuple[ContextPackage, str]:
+        record_id = self._orchestrator.ingest(envelope)
+        package = self._dispatch_context(
+            envelope=envelope,
+            record_id=record_id,
+            request_override=request_override,
+            analyze_kwargs=analyze_kwargs,
+        )
+        return package, self._compose_report(package)
+
+    @staticmethod
+    async def _call_prepare(prepare: Any, capability_inputs: Mapping[str, Any]) -> None:
+        result = prepare(**dict(capability_inputs))
+        if inspect.isawaitable(result):
+            await result
+
     def _extract_envelope(self, response: ChatResponse) -> AgentEnvelope | None:
         metadata = response.metadata or {}
         envelope_payload = metadata.get("_agent_envelope")
@@ -160,27 +197,31 @@ class CapabilityUpgradeWorkflow:
 
         package = self._orchestrator.dispatch(request)
 
-        if not any(item.record_id == record_id for item in package.items):
+        items = package.items
+        # 新写入的记录通常排在末尾，先检查最后一项，未命中再构建 id 集合。
+        if not (items and items[-1].record_id == record_id) and record_id not in {
+            item.record_id for item in items
+        }:
             # 如果本次信封被过滤掉，补充记录以便后续调试。
             raise ValueError("Newly ingested metacognitive record was not selected by the orchestrator.")
 
         return package
 
     def _compose_report(self, package: ContextPackage) -> str:
-        if not package.items:
-            return ""
-
-        sections: list[str] = []
-        for item in package.items:
-            summary = extract_payload_summary(item.payload)
-            if summary:
-                sections.append(summary.strip())
-                continue
-
-            if isinstance(item.payload, str):
-                sections.append(item.payload.strip())
-            else:
-                sections.append(str(item.payload))
-
-        return "\n\n".join(section for section in sections if section)
+        return "\n\n".join(_iter_sections(package.items))
+
+
+def _iter_sections(items: Iterable[Any]) -> Iterator[str]:
+    """逐条产出非空的上下文段落，避免先构建中间列表。"""
+
+    for item in items:
+        summary = extract_payload_summary(item.payload)
+        if summary:
+            section = summary.strip()
+        elif isinstance(item.payload, str):
+            section = item.payload.strip()
+        else:
+            section = str(item.payload)
+        if section:
+            yield section
 
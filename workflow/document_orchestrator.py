@@ -11,7 +11,7 @@ from pathlib import Path
 from typing import Any
 
 from workflow.content_extractor import ContentExtractor, ExtractedContent
-from workflow.finish_form_utils import update_form_section, read_form_section
+from workflow.finish_form_utils import extract_form_section, update_form_section, read_form_section, write_document_atomic
 
 
 @dataclass
@@ -168,11 +168,15 @@ class DocumentOrchestrator:
             )
     
     def finalize_document(self):
-        self._update_task_overview()
-        self._add_info_index()
+        # 读取一次、在内存中完成概览与索引的更新，最后原子地写回一次
+        original = self.document_path.read_text(encoding=self.encoding)
+        content = self._add_info_index(self._update_task_overview(original))
+        if content != original:
+            write_document_atomic(self.document_path, content.encode(self.encoding))
     
-    def _update_task_overview(self):
-        objective_section = read_form_section(self.document_path, marker_name="EXTERNAL_INFO") or ""
+    def _update_task_overview(self, current_content: str) -> str:
+        # 直接从调用方已读入的文档中取任务目标，避免再读一次磁盘
+        objective_section = extract_form_section(current_content, marker_name="EXTERNAL_INFO") or ""
         objective_match = re.search(r'### 任务目标\s*\n\n(.+?)(?=\n###|\n<!--|$)', objective_section, re.DOTALL)
         objective = objective_match.group(1).strip() if objective_match else ""
         
@@ -180,7 +184,6 @@ class DocumentOrchestrator:
 - 任务状态：{'已完成' if self.stage_outputs.get('stage4') else '进行中'}
 - 关键信息摘要：工具调用 {len(self.tool_calls)} 次，完成 {len(self.stage_outputs)} 个阶段"""
         
-        current_content = self.document_path.read_text(encoding=self.encoding)
         overview_pattern = re.compile(r'## 任务概览\s*\n\n(- 任务目标：.*?\n- 任务状态：.*?\n- 关键信息摘要：.*?)(?=\n---|\n##|$)', re.DOTALL)
         if overview_pattern.search(current_content):
             current_content = overview_pattern.sub(f"## 任务概览\n\n{overview_content}", current_content)
@@ -191,9 +194,9 @@ class DocumentOrchestrator:
             else:
                 current_content = current_content.replace("## 任务概览\n\n- 任务目标：\n- 任务状态：\n- 关键信息摘要：", f"## 任务概览\n\n{overview_content}")
         
-        self.document_path.write_text(current_content, encoding=self.encoding)
+        return current_content
     
-    def _add_info_index(self):
+    def _add_info_index(self, current_content: str) -> str:
         index_content = f"""
 ---
 
@@ -205,8 +208,7 @@ class DocumentOrchestrator:
 - 阶段输出数量: {len(self.stage_outputs)}
 """
         
-        current_content = self.document_path.read_text(encoding=self.encoding)
         if "详细信息索引" not in current_content:
             current_content = current_content.rstrip() + index_content
-            self.document_path.write_text(current_content, encoding=self.encoding)
+        return current_content
 
@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import os
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable
 
 DEFAULT_PLACEHOLDER = "`待填写`"
 LIVE_PLAN_MARKER = "LIVE_EXECUTION_PLAN"
+_MARKER_RE = re.compile(r"<!-- (\S+?)_(START|END) -->")
 
 
 def read_form_section(
@@ -16,20 +19,69 @@ def read_form_section(
     marker_name: str,
     encoding: str = "utf-8",
 ) -> str | None:
-    target = Path(path).expanduser().resolve()
-    if not target.exists():
+    try:
+        data = _resolve(str(path)).read_bytes()
+    except FileNotFoundError:
         return None
-    text = target.read_text(encoding=encoding).replace("\r\n", "\n")
+    start_marker, end_marker = _encoded_markers(marker_name, encoding)
+    span = _find_marker_block(data, start_marker, end_marker)
+    if span is None:
+        return None
+    start, end = span
+    # Only the slice between the markers is decoded.
+    return data[start + len(start_marker):end].decode(encoding).replace("\r\n", "\n").strip()
+
+
+def extract_form_section(content: str, *, marker_name: str) -> str | None:
+    """Like ``read_form_section`` but for a document already held in memory."""
+
     start_marker = f"<!-- {marker_name}_START -->"
-    end_marker = f"<!-- {marker_name}_END -->"
-    pattern = re.compile(
-        rf"{re.escape(start_marker)}\s*(.*?)\s*{re.escape(end_marker)}",
-        re.DOTALL,
+    start = content.find(start_marker)
+    if start == -1:
+        return None
+    end = content.find(f"<!-- {marker_name}_END -->", start + len(start_marker))
+    if end == -1:
+        return None
+    return content[start + len(start_marker):end].replace("\r\n", "\n").strip()
+
+
+def _resolve(path_str: str) -> Path:
+    """Resolve a finish_form path; absolute paths are resolved once and cached."""
+
+    path = Path(path_str).expanduser()
+    if not path.is_absolute():
+        # Relative paths depend on the current working directory, so they are never cached.
+        return path.resolve()
+    return _resolve_absolute(str(path))
+
+
+@lru_cache(maxsize=256)
+def _resolve_absolute(path_str: str) -> Path:
+    return Path(path_str).resolve()
+
+
+@lru_cache(maxsize=256)
+def _encoded_markers(marker_name: str, encoding: str) -> tuple[bytes, bytes]:
+    return (
+        f"<!-- {marker_name}_START -->".encode(encoding),
+        f"<!-- {marker_name}_END -->".encode(encoding),
     )
-    match = pattern.search(text)
-    if match:
-        return match.group(1).strip()
-    return None
+
+
+def _find_marker_block(data: bytes, start_marker: bytes, end_marker: bytes) -> tuple[int, int] | None:
+    """Locate the first start marker and the next end marker after it.
+
+    Returns ``(start_index, end_index)`` or ``None``. Markers are literals, so a
+    plain ``bytes.find`` on the raw document is enough; no decoding is needed.
+    """
+
+    start = data.find(start_marker)
+    if start == -1:
+        return None
+    end = data.find(end_marker, start + len(start_marker))
+    if end == -1:
+        return None
+    return start, end
 
 
 def read_live_plan(path: str | Path, encoding: str = "utf-8") -> str | None:
@@ -59,48 +111,60 @@ def update_form_section(
     encoding: str = "utf-8",
     placeholder: str = DEFAULT_PLACEHOLDER,
 ) -> None:
-    target = Path(path).expanduser().resolve()
-    if not target.exists():
-        raise FileNotFoundError(f"finish_form document not found: {target}")
+    target = _resolve(str(path))
+    try:
+        data = target.read_bytes()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"finish_form document not found: {target}") from None
+
+    # Search and splice on raw bytes; the document is never decoded or re-encoded as a whole.
+    normalized = data.replace(b"\r\n", b"\n")
+
+    sanitized = _sanitize_content(content, placeholder=placeholder).encode(encoding)
+    start_marker, end_marker = _encoded_markers(marker_name, encoding)
+    replacement_block = start_marker + b"\n" + sanitized + b"\n" + end_marker
+
+    span = _find_marker_block(normalized, start_marker, end_marker)
+    if span is not None:
+        start, end = span
+        new_data = normalized[:start] + replacement_block + normalized[end + len(end_marker):]
+    else:
+        insertion = replacement_block
+        header_pos = normalized.find(header.encode(encoding)) if header else -1
+        if header_pos != -1:
+            header_end = header_pos + len(header.encode(encoding))
+            insert_pos = normalized.find(b"\n", header_end)
+            if insert_pos == -1:
+                insert_pos = header_end
+            else:
+                insert_pos += 1
+            new_data = (
+                normalized[:insert_pos].rstrip(b"\n")
+                + b"\n\n"
+                + insertion
+                + b"\n"
+                + normalized[insert_pos:].lstrip(b"\n")
+            )
+        else:
+            new_data = normalized.rstrip(b"\n") + b"\n\n" + insertion + b"\n"
 
-    text = target.read_text(encoding=encoding)
-    normalized = text.replace("\r\n", "\n")
+    write_document_atomic(target, new_data)
 
-    sanitized = _sanitize_content(content, placeholder=placeholder)
-    start_marker = f"<!-- {marker_name}_START -->"
-    end_marker = f"<!-- {marker_name}_END -->"
-    replacement_block = f"{start_marker}\n{sanitized}\n{end_marker}"
 
-    pattern = re.compile(
-        rf"{re.escape(start_marker)}.*?{re.escape(end_marker)}",
-        re.DOTALL,
-    )
-    new_text, count = pattern.subn(lambda _: replacement_block, normalized, count=1)
+def write_document_atomic(path: str | Path, data: bytes) -> None:
+    """Replace ``path`` with ``data`` via a sibling temp file and ``os.replace``.
 
-    if count == 0:
-        insertion = replacement_block
-        if header:
-            header_pattern = re.compile(re.escape(header))
-            match = header_pattern.search(normalized)
-            if match:
-                insert_pos = normalized.find("\n", match.end())
-                if insert_pos == -1:
-                    insert_pos = match.end()
-                else:
-                    insert_pos += 1
-                new_text = (
-                    normalized[:insert_pos].rstrip("\n")
-                    + "\n\n"
-                    + insertion
-                    + "\n"
-                    + normalized[insert_pos:].lstrip("\n")
-                )
-            else:
-                new_text = normalized.rstrip("\n") + "\n\n" + insertion + "\n"
-        else:
-            new_text = normalized.rstrip("\n") + "\n\n" + insertion + "\n"
+    A crash mid-write never leaves a half-written form behind.
+    """
 
-    target.write_text(new_text.replace("\n", "\n"), encoding=encoding)
+    target = Path(path)
+    tmp = target.with_suffix(target.suffix + ".tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
 
 
 def _sanitize_content(content: str, *, placeholder: str) -> str:
@@ -116,24 +180,31 @@ def ensure_markers(
 ) -> None:
     """Ensure each marker pair exists in the document, appending placeholders if needed."""
 
-    target = Path(path).expanduser().resolve()
-    if not target.exists():
+    target = _resolve(str(path))
+    try:
+        text = target.read_text(encoding=encoding).replace("\r\n", "\n")
+    except FileNotFoundError:
         return
-
-    text = target.read_text(encoding=encoding).replace("\r\n", "\n")
     updated = False
 
+    # One pass over the document; a marker counts as present only if both ends exist.
+    seen: dict[str, set[str]] = {}
+    for match in _MARKER_RE.finditer(text):
+        seen.setdefault(match.group(1), set()).add(match.group(2))
+    present = {name for name, kinds in seen.items() if len(kinds) == 2}
+
+    # Collect the appended blocks and join once instead of re-copying the document per pair.
+    parts = [text.rstrip("\n")]
     for marker_name, placeholder in marker_pairs:
-        start_marker = f"<!-- {marker_name}_START -->"
-        end_marker = f"<!-- {marker_name}_END -->"
-        if start_marker in text and end_marker in text:
+        if marker_name in present:
             continue
-        block = (
-            f"{start_marker}\n{placeholder or DEFAULT_PLACEHOLDER}\n{end_marker}"
+        parts.append(
+            f"\n\n<!-- {marker_name}_START -->\n{placeholder or DEFAULT_PLACEHOLDER}\n<!-- {marker_name}_END -->"
         )
-        text = text.rstrip("\n") + "\n\n" + block + "\n"
+        present.add(marker_name)
         updated = True
 
     if updated:
-        target.write_text(text, encoding=encoding)
+        parts.append("\n")
+        target.write_bytes("".join(parts).encode(encoding))
 
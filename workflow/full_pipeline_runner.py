@@ -5,18 +5,30 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import functools
 import json
 import logging
 import os
+import random
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Any, Sequence
+from typing import Any, Awaitable, Callable, Coroutine, Sequence, TypeVar
 
 import httpx
 
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional speedup
+    uvloop = None
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
@@ -24,6 +36,7 @@ if str(PROJECT_ROOT) not in sys.path:
 load_dotenv(PROJECT_ROOT / ".env")
 
 from config import ModelConfig
+from model import DEFAULT_READ_TIMEOUT, create_shared_http_client, make_http_timeout
 from Document_Checking.template_generation import (
     TemplateGenerationAgent,
     TemplateGenerationConfig,
@@ -57,6 +70,19 @@ from workflow.document_orchestrator import DocumentOrchestrator
 
 LOGGER = logging.getLogger(__name__)
 
+_EXTERNAL_INFO_START = "<!-- EXTERNAL_INFO_START -->"
+_EXTERNAL_INFO_END = "<!-- EXTERNAL_INFO_END -->"
+
+_T = TypeVar("_T")
+
+
+if orjson is not None:
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+else:  # pragma: no cover - stdlib fallback
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
 
 @dataclass(slots=True)
 class SharedModelConfig:
@@ -64,6 +90,138 @@ class SharedModelConfig:
     model_name: str = "kimi-k2-250905"
     stream: bool = False
     base_url: str = "https://ark.cn-beijing.volces.com/api/v3"
+    # 仅在后端支持时设置（如 OpenAI 的 prompt_cache_key），其它后端可能拒绝未知参数
+    prompt_cache_key: str | None = None
+    # 非流式请求须等整段回答生成完才有首字节，推理模型可能需要数分钟
+    read_timeout: float = DEFAULT_READ_TIMEOUT
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """仅传输层错误、超时与 408/429/5xx 值得重试；其余 4xx 属于终态错误。"""
+
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+    else:
+        status = getattr(exc, "status_code", None)
+        if status is None:
+            # openai 的 APIConnectionError / APITimeoutError 以 httpx 传输错误为直接原因
+            return isinstance(exc.__cause__, httpx.TransportError)
+    return isinstance(status, int) and (status >= 500 or status in (408, 429))
+
+
+@dataclass(slots=True, frozen=True)
+class RetryPolicy:
+    """阶段调用的重试策略：指数退避、封顶并叠加随机抖动，避免多个调用同时重试。"""
+
+    attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def delay(self, attempt: int) -> float:
+        return min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def call(self, label: str, func: Callable[..., Awaitable[_T]], /, *args: Any, **kwargs: Any) -> _T:
+        attempt = 0
+        while True:
+            try:
+                return await func(*args, **kwargs)
+            except Exception as exc:
+                attempt += 1
+                if attempt >= self.attempts or not _is_retryable(exc):
+                    raise
+                delay = self.delay(attempt - 1)
+                LOGGER.warning(
+                    "%s attempt %d/%d failed: %s; retrying after %.1fs",
+                    label,
+                    attempt,
+                    self.attempts,
+                    exc,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+
+def _resolve_path(raw: str) -> Path:
+    """解析路径；绝对路径的结果会被缓存，重复创建调度器时无需再次解析。"""
+
+    path = Path(raw).expanduser()
+    if not path.is_absolute():
+        # 相对路径取决于当前工作目录，不能缓存
+        return path.resolve()
+    return _resolve_absolute_path(str(path))
+
+
+@functools.lru_cache(maxsize=32)
+def _resolve_absolute_path(raw: str) -> Path:
+    return Path(raw).resolve()
+
+
+@functools.singledispatch
+def _normalize_stage_output(value: Any) -> str:
+    """把代理返回的任意结构规整为文本；按类型分派，避免逐层 isinstance 探测。"""
+
+    text_attr = getattr(value, "text", None)
+    if isinstance(text_attr, str):
+        return text_attr
+
+    content_attr = getattr(value, "content", None)
+    if content_attr is not None:
+        return _normalize_stage_output(content_attr)
+
+    if hasattr(value, "__dict__"):
+        try:
+            payload = {
+                key: val
+                for key, val in value.__dict__.items()
+                if not key.startswith("_")
+            }
+        except Exception:
+            payload = None
+        if payload:
+            try:
+                return _dumps(payload)
+            except TypeError:  # orjson.JSONEncodeError 亦是 TypeError 子类
+                pass
+
+    return str(value)
+
+
+@_normalize_stage_output.register(type(None))
+def _(value: None) -> str:
+    return ""
+
+
+@_normalize_stage_output.register(str)
+def _(value: str) -> str:
+    return value
+
+
+@_normalize_stage_output.register(list)
+@_normalize_stage_output.register(tuple)
+def _(value: list | tuple) -> str:
+    segments: list[str] = []
+    for item in value:
+        normalized = item if type(item) is str else _normalize_stage_output(item)
+        normalized = normalized.strip()
+        if normalized:
+            segments.append(normalized)
+    return "\n".join(segments)
+
+
+@_normalize_stage_output.register(dict)
+def _(value: dict) -> str:
+    for key in ("text", "content"):
+        candidate = value.get(key)
+        if candidate is not None:
+            return _normalize_stage_output(candidate)
+    segments: list[str] = []
+    for key, item in value.items():
+        normalized = _normalize_stage_output(item).strip()
+        if normalized:
+            segments.append(f"{key}: {normalized}")
+    return "\n".join(segments)
 
 
 class FullPipelineRunner:
@@ -82,25 +240,41 @@ class FullPipelineRunner:
         watcher_config: ModelConfig | None = None,
     ) -> None:
         self._encoding = encoding
-        self._finish_form_dir = Path(finish_form_dir or PROJECT_ROOT / "finish_form").expanduser().resolve()
-        self._template_path = Path(
-            template_path or PROJECT_ROOT / "form_templates" / "standard template.md"
-        ).expanduser().resolve()
+        self._finish_form_dir = _resolve_path(str(finish_form_dir or PROJECT_ROOT / "finish_form"))
+        self._template_path = _resolve_path(
+            str(template_path or PROJECT_ROOT / "form_templates" / "standard template.md")
+        )
         self._finish_form_dir.mkdir(parents=True, exist_ok=True)
 
         if not self._template_path.is_file():
             raise FileNotFoundError(f"模板文件未找到: {self._template_path}")
 
+        # 所有代理共用一个连接池，避免每个代理各自握手
+        self._http_client = create_shared_http_client(read_timeout=shared_config.read_timeout)
+        # OpenAI 客户端按请求覆盖超时，需显式传入拆分后的超时
+        shared_client_args = {
+            "http_client": self._http_client,
+            "timeout": make_http_timeout(shared_config.read_timeout),
+        }
+        # 经 RetryPolicy 调用的代理关闭 SDK 内置重试，只保留一层重试；
+        # 阶段四与 Watcher 不经 RetryPolicy，仍沿用 SDK 的请求级重试
+        retry_client_args = {**shared_client_args, "max_retries": 0}
+        # 各阶段请求携带同一个缓存键，便于服务端复用相同前缀的 KV 缓存
+        shared_generate_kwargs: dict[str, Any] = {}
+        if shared_config.prompt_cache_key:
+            shared_generate_kwargs["extra_body"] = {"prompt_cache_key": shared_config.prompt_cache_key}
+
         model_config = ModelConfig(
             api_key=shared_config.api_key
-            or os.getenv("OPENAI_API_KEY")
-            or os.getenv("KIMI_API_KEY")
-            or os.getenv("DEEPSEEK_API_KEY"),
+            or _first_env("OPENAI_API_KEY", "KIMI_API_KEY", "DEEPSEEK_API_KEY"),
             model_name=shared_config.model_name,
             stream=shared_config.stream,
             base_url=shared_config.base_url,
+            client_args=dict(retry_client_args),
+            generate_kwargs=dict(shared_generate_kwargs),
         )
         model_config.validate()
+        self._base_url = model_config.base_url
 
         template_config = TemplateGenerationConfig(
             threshold=template_threshold,
@@ -114,14 +288,15 @@ class FullPipelineRunner:
         self._stage1_agent = MetacognitiveAnalysisAgent(config=model_config)
         self._candidate_agent = CandidateSelectionAgent(config=model_config)
         self._stage2_agent = StrategySelectionAgent(config=model_config)
-        self._stage2_selection_retry_attempts = 3
-        self._stage2_selection_retry_delay = 1.0
+        self._retry_policy = RetryPolicy()
 
         stage2_upgrade_config = Stage2CapabilityUpgradeConfig(
             api_key=model_config.api_key,
             model_name=model_config.model_name,
             stream=model_config.stream,
             base_url=model_config.base_url,
+            client_args=dict(retry_client_args),
+            generate_kwargs=dict(shared_generate_kwargs),
             auto_apply_patch=strategy_auto_apply,
         )
         self._stage2_upgrade_agent = Stage2CapabilityUpgradeAgent(config=stage2_upgrade_config)
@@ -131,24 +306,65 @@ class FullPipelineRunner:
             model_name=model_config.model_name,
             stream=model_config.stream,
             base_url=model_config.base_url,
+            client_args=dict(retry_client_args),
+            generate_kwargs=dict(shared_generate_kwargs),
             auto_apply_patch=capability_auto_apply,
         )
         self._capability_agent = CapabilityUpgradeAgent(config=capability_config)
 
         self._stage3_agent = Stage3ExecutionAgent(config=model_config)
-        self._stage4_agent = Stage4ExecutorAgent(config=model_config)
+        stage4_config = replace(model_config, client_args=dict(shared_client_args))
+        self._stage4_agent = Stage4ExecutorAgent(config=stage4_config)
         self._tools_bridge = create_tools_bridge()
 
         watcher_flag = watcher_enabled if watcher_enabled is not None else True
         self._watcher_agent: WatcherAgent | None = None
         if watcher_flag:
             try:
-                watcher_model_config = watcher_config if watcher_config else model_config
+                if watcher_config:
+                    watcher_model_config = replace(
+                        watcher_config,
+                        client_args={**shared_client_args, **watcher_config.client_args},
+                        generate_kwargs={**shared_generate_kwargs, **watcher_config.generate_kwargs},
+                    )
+                else:
+                    watcher_model_config = stage4_config
                 self._watcher_agent = WatcherAgent(config=watcher_model_config)
             except Exception as exc:
                 LOGGER.warning("WatcherAgent 初始化失败，已自动禁用：%s", exc)
                 self._watcher_agent = None
 
+    async def __aenter__(self) -> FullPipelineRunner:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """关闭所有代理共享的 HTTP 连接池，并关闭工具桥（后台事件循环、Firecrawl 客户端与沙箱工作进程）。
+
+        调度器可在 ``async with`` 块内多次调用 ``run()``，各次运行复用同一组代理与连接池。
+        """
+
+        try:
+            await self._http_client.aclose()
+        finally:
+            # close() 会 join 后台线程，放到线程中避免阻塞事件循环
+            await asyncio.to_thread(self._tools_bridge.close)
+
+    async def prewarm(self) -> None:
+        """预先与模型服务建立连接（TCP/TLS/HTTP2 握手），使阶段一无需承担握手延迟。
+
+        只关心连接进入连接池，响应状态无关紧要；失败时静默忽略。
+        """
+
+        if not self._base_url:
+            return
+        try:
+            await self._http_client.head(self._base_url, timeout=2.0)
+        except httpx.HTTPError as exc:
+            LOGGER.debug("连接预热失败，已忽略：%s", exc)
+
     async def run(
         self,
         *,
@@ -158,36 +374,65 @@ class FullPipelineRunner:
         tool_catalog: Sequence[str] | None = None,
     ) -> dict[str, Any]:
         resolved_tool_catalog = self._resolve_tool_catalog(tool_catalog)
-        document_path = self._prepare_finish_form_document(objective, context_snapshot, resolved_tool_catalog)
+        # 模板复制与外部信息写入发生在任何并发任务启动之前，放到线程中避免阻塞事件循环；
+        # 同时预热连接池，握手与文档准备重叠进行
+        document_path, _ = await asyncio.gather(
+            asyncio.to_thread(
+                self._prepare_finish_form_document,
+                objective,
+                context_snapshot,
+                resolved_tool_catalog,
+            ),
+            self.prewarm(),
+        )
         
         orchestrator = DocumentOrchestrator(document_path, encoding=self._encoding)
 
         stage1_text = await self._run_stage1(document_path, orchestrator, objective=objective)
 
-        stage2_candidate_text = await self._run_stage2_candidate(
-            document_path,
-            orchestrator,
-            objective=objective,
-            candidate_limit=candidate_limit,
-        )
+        # 依赖关系：能力库升级只读取外部信息与阶段一输出；阶段二-C 只依赖阶段二-B，
+        # 其输出（STAGE2C_ANALYSIS、策略库）不被阶段三/四读取。两者作为旁路任务与主链并行。
+        # 所有 finish_form 写入都在事件循环线程内同步完成，不会交错。
+        side_tasks: list[asyncio.Task] = []
+        try:
+            capability_task = asyncio.create_task(self._run_capability_upgrade(document_path))
+            side_tasks.append(capability_task)
 
-        stage2_selection_text = await self._run_stage2_selection(
-            document_path,
-            orchestrator,
-            objective=objective,
-        )
+            stage2_candidate_text = await self._run_stage2_candidate(
+                document_path,
+                orchestrator,
+                objective=objective,
+                candidate_limit=candidate_limit,
+            )
+
+            stage2_selection_text = await self._run_stage2_selection(
+                document_path,
+                orchestrator,
+                objective=objective,
+            )
 
-        stage2_upgrade_text = await self._run_stage2_upgrade(document_path, orchestrator)
+            upgrade_task = asyncio.create_task(self._run_stage2_upgrade(document_path, orchestrator))
+            side_tasks.append(upgrade_task)
 
-        stage3_text = await self._run_stage3(document_path, orchestrator, objective=objective)
+            stage3_text = await self._run_stage3(document_path, orchestrator, objective=objective)
 
-        stage4_text = await self._run_stage4(document_path, orchestrator, objective=objective)
+            stage4_text = await self._run_stage4(document_path, orchestrator, objective=objective)
 
-        watcher_audit_text = MemoryBridge.load_stage_output(document_path, "WATCHER_AUDIT") or None
+            stage2_upgrade_text = await upgrade_task
+            capability_upgrade_text = await capability_task
+        except BaseException:
+            for task in side_tasks:
+                task.cancel()
+            # 等待取消完成并取回旁路任务的异常，避免 "Task exception was never retrieved"
+            await asyncio.gather(*side_tasks, return_exceptions=True)
+            raise
 
-        capability_upgrade_text = await self._run_capability_upgrade(document_path)
+        # 旁路任务均已结束，此时不再有并发写入，可安全地在线程中读写文档
+        watcher_audit_text = (
+            await asyncio.to_thread(MemoryBridge.load_stage_output, document_path, "WATCHER_AUDIT")
+        ) or None
 
-        orchestrator.finalize_document()
+        await asyncio.to_thread(orchestrator.finalize_document)
 
         return {
             "document": self._relativize(document_path),
@@ -207,7 +452,6 @@ class FullPipelineRunner:
         context_snapshot: str | None,
         tool_catalog: Sequence[str] | None,
     ) -> Path:
-        before = set(self._finish_form_dir.glob("*.md"))
         result = self._template_agent.run()
         created = result.get("created")
         if created:
@@ -216,20 +460,26 @@ class FullPipelineRunner:
                 self._write_external_context(candidate, objective, context_snapshot, tool_catalog)
                 return candidate
 
-        after = set(self._finish_form_dir.glob("*.md"))
-        new_docs = after - before
-        if new_docs:
-            doc = max(new_docs, key=lambda item: item.stat().st_mtime)
-            self._write_external_context(doc, objective, context_snapshot, tool_catalog)
-            return doc
-
-        if after:
-            doc = max(after, key=lambda item: item.stat().st_mtime)
+        # 模板代理未新建文档（已超过阈值）时，复用最近修改的文档
+        doc = self._latest_finish_form_document()
+        if doc is not None:
             self._write_external_context(doc, objective, context_snapshot, tool_catalog)
             return doc
 
         raise RuntimeError("未能创建或定位 finish_form 文档。")
 
+    def _latest_finish_form_document(self) -> Path | None:
+        latest_path: str | None = None
+        latest_mtime = -1
+        with os.scandir(self._finish_form_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".md") or not entry.is_file():
+                    continue
+                mtime = entry.stat().st_mtime_ns
+                if mtime > latest_mtime:
+                    latest_path, latest_mtime = entry.path, mtime
+        return Path(latest_path) if latest_path is not None else None
+
     def _write_external_context(
         self,
         document_path: Path,
@@ -238,33 +488,29 @@ class FullPipelineRunner:
         tool_catalog: Sequence[str] | None,
     ) -> None:
         content = document_path.read_text(encoding=self._encoding)
-        updated = False
-
-        marker_start = "<!-- EXTERNAL_INFO_START -->"
-        marker_end = "<!-- EXTERNAL_INFO_END -->"
-        if marker_start in content and marker_end in content:
-            start_idx = content.find(marker_start) + len(marker_start)
-            end_idx = content.find(marker_end)
-            
-            external_info = []
-            external_info.append(f"### 任务目标\n\n{objective}\n")
-            
-            if context_snapshot:
-                external_info.append(f"### 外部上下文\n\n{context_snapshot}\n")
-            else:
-                external_info.append("### 外部上下文\n\n")
-            
-            external_info.append("### 可用工具清单\n")
-            if tool_catalog:
-                tool_list = "\n".join(f"- {tool}" for tool in tool_catalog)
-                external_info.append(f"{tool_list}\n")
-            
-            new_content = "\n" + "\n".join(external_info)
-            content = content[:start_idx] + new_content + content[end_idx:]
-            updated = True
-
-        if updated:
-            document_path.write_text(content, encoding=self._encoding)
+
+        # 单次前向扫描：结束标记从开始标记之后查找
+        start_idx = content.find(_EXTERNAL_INFO_START)
+        if start_idx == -1:
+            return
+        start_idx += len(_EXTERNAL_INFO_START)
+        end_idx = content.find(_EXTERNAL_INFO_END, start_idx)
+        if end_idx == -1:
+            return
+
+        snapshot_block = f"{context_snapshot}\n" if context_snapshot else ""
+        tool_block = "\n" + "".join(f"- {tool}\n" for tool in tool_catalog) if tool_catalog else ""
+        new_block = (
+            f"\n### 任务目标\n\n{objective}\n"
+            f"\n### 外部上下文\n\n{snapshot_block}"
+            f"\n### 可用工具清单\n"
+            f"{tool_block}"
+        )
+        if content[start_idx:end_idx] == new_block:
+            return
+
+        content = content[:start_idx] + new_block + content[end_idx:]
+        document_path.write_text(content, encoding=self._encoding)
 
     @staticmethod
     def _relativize(path: Path) -> str:
@@ -293,7 +539,9 @@ class FullPipelineRunner:
             objective=objective,
         )
         try:
-            result_text = await self._stage1_agent.analyze_text(
+            result_text = await self._retry_policy.call(
+                "Stage 1",
+                self._stage1_agent.analyze_text,
                 context=context_block,
             )
         except Exception as exc:
@@ -322,7 +570,9 @@ class FullPipelineRunner:
             kwargs["candidate_limit"] = candidate_limit
 
         try:
-            result_text = await self._candidate_agent.analyze_text(
+            result_text = await self._retry_policy.call(
+                "Stage 2 Candidate",
+                self._candidate_agent.analyze_text,
                 context=context,
                 **kwargs,
             )
@@ -341,10 +591,15 @@ class FullPipelineRunner:
         *,
         objective: str,
     ) -> str:
+        context = create_stage2b_context(
+            finish_form_path=str(document_path),
+            objective=objective,
+        )
         try:
-            result_text = await self._run_stage2_selection_with_retries(
-                document_path=document_path,
-                objective=objective,
+            result_text = await self._retry_policy.call(
+                "Stage 2 Selection",
+                self._stage2_agent.analyze_text,
+                context=context,
             )
         except Exception as exc:
             self._log_stage_exception("阶段二-B 策略遴选失败", exc)
@@ -354,43 +609,15 @@ class FullPipelineRunner:
         orchestrator.register_stage_output('stage2_selection', normalized)
         return normalized
 
-    async def _run_stage2_selection_with_retries(
-        self,
-        *,
-        document_path: Path,
-        objective: str,
-    ) -> str:
-        context = create_stage2b_context(
-            finish_form_path=str(document_path),
-            objective=objective,
-        )
-
-        retries = 0
-        while True:
-            try:
-                return await self._stage2_agent.analyze_text(
-                    context=context,
-                )
-            except httpx.HTTPError as exc:
-                retries += 1
-                if retries >= self._stage2_selection_retry_attempts:
-                    raise
-                LOGGER.warning(
-                    "Stage 2 Selection attempt %d/%d failed: %s; retrying after %.1fs",
-                    retries,
-                    self._stage2_selection_retry_attempts,
-                    exc,
-                    self._stage2_selection_retry_delay,
-                )
-                await asyncio.sleep(self._stage2_selection_retry_delay)
-
     async def _run_stage2_upgrade(self, document_path: Path, orchestrator: DocumentOrchestrator) -> str | None:
         context = create_stage2b_context(
             finish_form_path=str(document_path),
             objective="",
         )
         try:
-            result_text = await self._stage2_upgrade_agent.evaluate_text(
+            result_text = await self._retry_policy.call(
+                "Stage 2 Upgrade",
+                self._stage2_upgrade_agent.evaluate_text,
                 context=context,
             )
         except Exception as exc:
@@ -415,7 +642,9 @@ class FullPipelineRunner:
         )
 
         try:
-            result_text = await self._stage3_agent.analyze_text(
+            result_text = await self._retry_policy.call(
+                "Stage 3",
+                self._stage3_agent.analyze_text,
                 context=context,
             )
         except Exception as exc:
@@ -460,7 +689,9 @@ class FullPipelineRunner:
             objective="",
         )
         try:
-            result_text = await self._capability_agent.evaluate_text(
+            result_text = await self._retry_policy.call(
+                "Capability Upgrade",
+                self._capability_agent.evaluate_text,
                 context=context,
             )
         except Exception as exc:
@@ -470,70 +701,17 @@ class FullPipelineRunner:
 
     @staticmethod
     def _log_stage_exception(stage: str, exc: Exception) -> None:
-        import traceback
-
-        print("\n" + "=" * 60)
-        print(f"{stage}，异常详情：{exc.__class__.__name__}: {exc}")
-        traceback.print_exc(limit=None)
-        print("=" * 60 + "\n")
+        LOGGER.error("%s，异常详情：%s: %s", stage, exc.__class__.__name__, exc, exc_info=exc)
 
     @staticmethod
     def _normalize_stage_output(value: Any) -> str:
-        if value is None:
-            return ""
-
-        if isinstance(value, str):
-            return value
-
-        if isinstance(value, (list, tuple)):
-            segments = [
-                FullPipelineRunner._normalize_stage_output(item).strip()
-                for item in value
-            ]
-            return "\n".join(segment for segment in segments if segment)
-
-        if isinstance(value, dict):
-            for key in ("text", "content"):
-                candidate = value.get(key)
-                if candidate is not None:
-                    return FullPipelineRunner._normalize_stage_output(candidate)
-            segments: list[str] = []
-            for key, item in value.items():
-                normalized = FullPipelineRunner._normalize_stage_output(item).strip()
-                if normalized:
-                    segments.append(f"{key}: {normalized}")
-            return "\n".join(segments)
-
-        text_attr = getattr(value, "text", None)
-        if isinstance(text_attr, str):
-            return text_attr
-
-        content_attr = getattr(value, "content", None)
-        if content_attr is not None:
-            return FullPipelineRunner._normalize_stage_output(content_attr)
-
-        if hasattr(value, "__dict__"):
-            try:
-                payload = {
-                    key: val
-                    for key, val in value.__dict__.items()
-                    if not key.startswith("_")
-                }
-            except Exception:
-                payload = None
-            if payload:
-                try:
-                    return json.dumps(payload, ensure_ascii=False)
-                except TypeError:
-                    pass
-
-        return str(value)
+        return _normalize_stage_output(value)
 
 
 def _parse_tool_catalog(raw: str | None) -> list[str] | None:
     if not raw:
         return None
-    items = [item.strip() for item in raw.split(",") if item.strip()]
+    items = [item for item in map(str.strip, raw.split(",")) if item]
     return items or None
 
 
@@ -551,6 +729,15 @@ def _parse_args() -> argparse.Namespace:
     parser.add_argument("--model", default=os.getenv("MODEL_NAME", "gemini-3-pro"), help="模型名称。")
     parser.add_argument("--base-url", default=os.getenv("MODEL_BASE_URL", "https://xh-hk.a3e.top/v1"), help="模型服务基础地址。")
     parser.add_argument("--stream", action="store_true", help="启用流式输出。")
+    parser.add_argument(
+        "--prompt-cache-key",
+        help="提示词前缀缓存键（后端支持 prompt_cache_key 时使用）。",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        help=f"模型请求的读取超时秒数（默认读取 MODEL_READ_TIMEOUT，未设置时为 {DEFAULT_READ_TIMEOUT:g}）。",
+    )
     parser.add_argument(
         "--no-strategy-auto-apply",
         action="store_true",
@@ -606,21 +793,32 @@ def _print_stage_outputs(result: dict[str, Any]) -> None:
     print("\n" + divider)
 
 
+def _first_env(*keys: str) -> str | None:
+    """按顺序返回第一个非空的环境变量值。"""
+
+    for key in keys:
+        value = os.environ.get(key)
+        if value:
+            return value
+    return None
+
+
 async def _async_main(args: argparse.Namespace) -> dict[str, Any]:
-    api_key = (
-        os.getenv("DEEPSEEK_API_KEY")
-        or os.getenv("OPENAI_API_KEY")
-        or os.getenv("KIMI_API_KEY")
-        or args.api_key
-    )
-    model_name = os.getenv("MODEL_NAME") or args.model
-    base_url = os.getenv("MODEL_BASE_URL") or args.base_url
+    env_api_key = _first_env("DEEPSEEK_API_KEY", "OPENAI_API_KEY", "KIMI_API_KEY")
+    env_model_name = _first_env("MODEL_NAME")
+    env_base_url = _first_env("MODEL_BASE_URL")
+
+    api_key = env_api_key or args.api_key
+    model_name = env_model_name or args.model
+    base_url = env_base_url or args.base_url
     
     shared_config = SharedModelConfig(
         api_key=api_key,
         model_name=model_name,
         stream=args.stream,
         base_url=base_url,
+        prompt_cache_key=args.prompt_cache_key or _first_env("PROMPT_CACHE_KEY"),
+        read_timeout=args.read_timeout or float(_first_env("MODEL_READ_TIMEOUT") or DEFAULT_READ_TIMEOUT),
     )
     watcher_enabled = not args.no_watcher
     watcher_config = None
@@ -629,15 +827,9 @@ async def _async_main(args: argparse.Namespace) -> dict[str, Any]:
         if args.watcher_stream:
             watcher_stream = True
 
-        watcher_api_key = (
-            os.getenv("DEEPSEEK_API_KEY")
-            or os.getenv("OPENAI_API_KEY")
-            or os.getenv("KIMI_API_KEY")
-            or args.watcher_api_key
-            or shared_config.api_key
-        )
-        watcher_model_name = args.watcher_model or os.getenv("MODEL_NAME") or shared_config.model_name
-        watcher_base_url = args.watcher_base_url or os.getenv("MODEL_BASE_URL") or shared_config.base_url
+        watcher_api_key = env_api_key or args.watcher_api_key or shared_config.api_key
+        watcher_model_name = args.watcher_model or env_model_name or shared_config.model_name
+        watcher_base_url = args.watcher_base_url or env_base_url or shared_config.base_url
         
         watcher_config = ModelConfig(
             api_key=watcher_api_key,
@@ -646,7 +838,8 @@ async def _async_main(args: argparse.Namespace) -> dict[str, Any]:
             base_url=watcher_base_url,
             reasoning_effort=args.watcher_reasoning_effort,
         )
-    runner = FullPipelineRunner(
+    tool_catalog = _parse_tool_catalog(args.tool_catalog)
+    async with FullPipelineRunner(
         shared_config=shared_config,
         finish_form_dir=args.finish_dir,
         template_path=args.template,
@@ -655,14 +848,26 @@ async def _async_main(args: argparse.Namespace) -> dict[str, Any]:
         capability_auto_apply=args.auto_apply_capability,
         watcher_enabled=watcher_enabled,
         watcher_config=watcher_config,
-    )
-    tool_catalog = _parse_tool_catalog(args.tool_catalog)
-    return await runner.run(
-        objective=args.objective,
-        context_snapshot=args.context,
-        candidate_limit=args.candidate_limit,
-        tool_catalog=tool_catalog,
-    )
+    ) as runner:
+        return await runner.run(
+            objective=args.objective,
+            context_snapshot=args.context,
+            candidate_limit=args.candidate_limit,
+            tool_catalog=tool_catalog,
+        )
+
+
+def _run_event_loop(coro: Coroutine[Any, Any, _T]) -> _T:
+    """有 uvloop 时在 uvloop 事件循环上运行，否则退回标准 asyncio.run。"""
+
+    if uvloop is None:
+        return asyncio.run(coro)
+    if sys.version_info >= (3, 11):
+        # 通过 loop_factory 指定事件循环，不改动全局事件循环策略
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(coro)
+    uvloop.install()  # pragma: no cover - Python 3.10
+    return asyncio.run(coro)
 
 
 def main() -> None:
@@ -677,7 +882,7 @@ def main() -> None:
         print("未提供任务目标，已取消执行。")
         raise SystemExit(1)
     try:
-        result = asyncio.run(_async_main(args))
+        result = _run_event_loop(_async_main(args))
     except KeyboardInterrupt:
         print("已取消。")
         raise SystemExit(130) from None